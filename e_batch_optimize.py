@@ -0,0 +1,118 @@
+"""
+Headless batch optimization of every case in configs.toml.
+Each (case, seed) run builds its own layout and optimizer in a worker
+process; the best door states, losses and timings of all runs are written
+to a JSON file. Failing cases are recorded instead of stopping the batch.
+
+    python e_batch_optimize.py --seeds 0 1 2 --workers 8
+"""
+
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import e_multi_optimize
+import u_parallel
+from u_loader import ULoader
+
+
+def run_case(case_id, seed=None):
+    """Optimize one case; returns a JSON-serializable record"""
+    record = {"case_id": case_id, "seed": seed, "status": "ok"}
+    t0 = time.perf_counter()
+    try:
+        fp, config = e_multi_optimize.init_layout(case_id, seed)
+        record.update(
+            file_name=config.file_name,
+            seed=config.random_seed,
+            optimizer=config.optimizer,
+            iterations=config.iterations,
+        )
+
+        door_system = e_multi_optimize.create_door_system(fp, config)
+        samples = e_multi_optimize.make_sample_points(
+            fp, config.sample_size, config.sampler
+        )
+        # no case_id: "mtm" scores its tries in this process
+        opt = e_multi_optimize.create_optimizer(
+            fp, door_system, config, samples
+        )
+        t1 = time.perf_counter()
+
+        opt.init()
+        initial_loss = opt.prev_score
+        for _ in range(config.iterations):
+            opt.step(sigma=config.sigma)
+        opt.end()
+        t2 = time.perf_counter()
+
+        eids, ratios = u_parallel.to_eid_states(*door_system.get_states())
+        record.update(
+            initial_loss=float(initial_loss),
+            best_loss=float(opt.best_score),  # of the saved door states
+            n_accepted=len(opt.losses),
+            eids=eids,
+            ratios=ratios,
+            setup_time=t1 - t0,
+            optimize_time=t2 - t1,
+        )
+    except Exception as e:
+        record.update(status="failed", error=repr(e))
+        record["traceback"] = traceback.format_exc()
+    record["total_time"] = time.perf_counter() - t0
+    return record
+
+
+def run_batch(case_ids, seeds, workers=None):
+    """Run every (case, seed) pair on a process pool"""
+    tasks = [(c, s) for c in case_ids for s in seeds]
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_case, c, s) for c, s in tasks]
+        for future in as_completed(futures):
+            r = future.result()
+            records.append(r)
+            loss = r.get("best_loss")
+            print(
+                f"[{len(records)}/{len(tasks)}] case {r['case_id']}"
+                f" seed {r['seed']}: {r['status']}"
+                + (f" | best {loss:.4f}" if loss is not None else "")
+                + f" | {r['total_time']:.1f}s"
+            )
+
+    return sorted(records, key=record_order)
+
+
+def record_order(record):
+    """By case, then seed (the config seed, None, first)"""
+    seed = record["seed"]
+    return record["case_id"], -1 if seed is None else seed
+
+
+def save(path, records, wall_time):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"wall_time": wall_time, "runs": records}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--cases", type=int, nargs="*", default=None)
+    parser.add_argument("--seeds", type=int, nargs="*", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="./results/batch.json")
+    args = parser.parse_args()
+
+    ULoader.load_config()
+    case_ids = args.cases or list(range(ULoader.get_case_count()))
+    seeds = args.seeds or [None]  # None: random_seed of configs.toml
+
+    t0 = time.perf_counter()
+    records = run_batch(case_ids, seeds, args.workers)
+    save(args.out, records, time.perf_counter() - t0)
+
+    n_failed = sum(r["status"] != "ok" for r in records)
+    print(f"{len(records)} runs, {n_failed} failed -> {args.out}")
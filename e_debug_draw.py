@@ -27,14 +27,13 @@ from u_visualization import Visualizer
 def init(case_id):
     # Load configs and data
     ULoader.load_config()
-    config, obj_data = ULoader.get_config_and_obj(case_id)
+    config = ULoader.get_config(case_id)
 
     np.random.seed(config.random_seed)
 
-    # Create floor plan
+    # Create floor plan (cached in ./cache after the first run)
     fp = FLayout()
-    fp.from_obj_data(obj_data)
-    fp.init_rooms()
+    fp.from_obj_file(config.path)
     fp.set_room_connections()
 
     # Visualization
@@ -1,6 +1,5 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from tqdm import tqdm
 
 # Basic Primitives
 from f_layout import FLayout
@@ -12,30 +11,25 @@ from s_door_system import DoorSystem
 from s_door_component import DoorComponent
 
 # Optimization
+import o_sweep
 from o_loss_func import loss_func
 from u_obj_loader import UObjLoader
 from u_visualization import Visualizer
 
 
-def init_fp_vis(case_id, np_seed=0):
+def init_fp(np_seed=0):
     # Settings
     np.random.seed(np_seed)
 
     # Load data
-    ld = UObjLoader(".")
-    # ld.load_closed_rooms_case(case_id)
-    ld.load_custom("/assets/2r1d_loss.obj")
+    obj_data = UObjLoader.load("/assets/2r1d_loss.obj")
 
     fp = FLayout()
-    fp.create(ld.vertices, ld.edges, 0)
+    fp.create(obj_data.verts, obj_data.edges, 0)
     fp.init_rooms()
     fp.set_room_connections()
 
-    # Visualization
-    vis = Visualizer()
-    vis.draw_mesh(fp, debug_text="e")
-
-    return fp, vis
+    return fp
 
 
 def create_door_system(fp):
@@ -82,61 +76,42 @@ def f(fp, sp, batch_size=50):
     return loss / valid_paths if valid_paths > 0 else float("inf")
 
 
-def metropolis_hasting(fp, door_system, iters=200):
-    # Metropolis-Hastings settings
-    old_score = f(fp, sp)
-    losses = []
-
-    best_score = old_score
-    best_e, best_r = door_system.get_states()
-
-    door_comp = door_system.ecs.get_door_component(0)
-
-    for iteration in range(iters):
-
-        door_system.move_all_by(0.02)
-        print(iteration, door_comp)
-
-        new_score = f(fp, sp)
-
-        center = door_system.ratio_to_xy(door_comp, door_comp.ratio)
-        losses.append([center, new_score])
-
-    door_system.deactivate(door_comp)
-
-    return best_e, best_r, losses
+def build(n_sp=400):
+    """Headless setup for o_sweep workers: (layout, system, f, samples)"""
+    fp = init_fp()
+    door_system = create_door_system(fp)
+    sp = make_sample_points(n_sp)
+    return fp, door_system, f, sp
 
 
 if __name__ == "__main__":
     # Initialize
-    case_id = 3
     n_sp = 400
-    iters = 80
-
-    fp, vis = init_fp_vis(case_id)
+    resolution = 0.02
 
-    vis.draw_mesh(fp, debug_text="ve")
-    vis.draw_floor_plan(fp, draw_connection=True)
-
-    door_system = create_door_system(fp)
+    fp, door_system, _, sp = build(n_sp)
 
-    sp = make_sample_points(n_sp)
+    vis = Visualizer()
+    vis.draw_mesh(fp, debug_text="e")
 
-    best_e, best_r, losses = metropolis_hasting(fp, door_system, iters=iters)
+    # loss landscape of the door along its wall
+    sweep = o_sweep.sweep_doors(
+        fp,
+        door_system,
+        f,
+        sp,
+        resolution=resolution,
+        builder=build,
+        builder_args=(n_sp,),
+    )
+    o_sweep.save("./results/2r1d_loss.npz", sweep)
 
     # visualize
-    vis.draw_mesh(fp)
-    # vis.draw_floor_plan(fp, show=True, draw_connection=True)
-
-    xx = [x[0][0] for x in losses]
-    yy = [x[0][1] for x in losses]
-    ss = [x[1] for x in losses]
-
-    plt.scatter(xx, yy, c=ss, cmap="viridis")
+    plt.scatter(sweep["x"], sweep["y"], c=sweep["loss"], cmap="viridis")
     plt.colorbar()
     plt.savefig("./2r1d_loss.svg")
     plt.show()
 
-    plt.plot(ss)
+    plt.plot(sweep["s"], sweep["loss"])
     plt.savefig("./loss_func_plot.svg")
     plt.show()
@@ -12,8 +12,9 @@ from f_layout import FLayout
 from g_primitives import Vertex as Point
 
 # Optimization
-from o_loss_func import loss_func, traffic_loss_func
-from o_optimizer import MHOptimizer
+from o_loss_func import loss_func, traffic_loss_func, pad_paths, path_lengths
+from o_od_traffic import ODTrafficLoss
+from o_optimizer import MHOptimizer, GibbsMHOptimizer, MTMOptimizer
 
 # DOOR SYSTEM
 from s_ecs import ECS
@@ -25,23 +26,47 @@ from u_visualization import Visualizer
 
 
 def init(case_id):
+    fp, config = init_layout(case_id)
+
+    # Visualization
+    vis = Visualizer()
+    # vis.draw_mesh(fp, debug_text="vef").set_axis(axis_off=True).show() # for debug
+
+    return fp, vis, config
+
+
+def init_layout(case_id, seed=None):
     # Load configs and data
     ULoader.load_config()
-    config, obj_data = ULoader.get_config_and_obj(case_id)
+    config = ULoader.get_config(case_id)
+    if seed is not None:
+        config.random_seed = seed
 
     np.random.seed(config.random_seed)
 
-    # Create floor plan
+    # Create floor plan (cached in ./cache after the first run)
     fp = FLayout()
-    fp.from_obj_data(obj_data)
-    fp.init_rooms()
+    fp.from_obj_file(config.path)
     fp.set_room_connections()
 
-    # Visualization
-    vis = Visualizer()
-    # vis.draw_mesh(fp, debug_text="vef").set_axis(axis_off=True).show() # for debug
+    return fp, config
 
-    return fp, vis, config
+
+def build_case(case_id):
+    """Headless setup: (layout, door system, objective, sample points)"""
+    fp, config = init_layout(case_id)
+    door_system = create_door_system(fp, config)
+    sample_points = make_sample_points(fp, config.sample_size, config.sampler)
+    f = create_objective(door_system, config.traffic)
+    return fp, door_system, f, sample_points
+
+
+def doors_fit(fp, config):
+    """Whether every door of the config joins two rooms that share a wall"""
+    return all(
+        fp.get_by_rid(rb) in fp.get_by_rid(ra).adjs
+        for ra, rb, *_ in config.doors
+    )
 
 
 def create_door_system(fp, config):
@@ -72,31 +97,50 @@ def create_door_system(fp, config):
     return door_system
 
 
-def make_sample_points(fp, n=300):
-    sample_points = []
-    while n > 0:
-        p = Point(np.random.rand(2))
-        if fp.is_inside(p):
-            sample_points.append(p)
-            n -= 1
-    return sample_points
+def make_sample_points(fp, n=300, method="random"):
+    points, _ = fp.sample_points(n, method=method)
+    return [Point(xy) for xy in points]
 
 
-def f(fp, sample_points, batch_size=50):
-    # indices = np.random.choice(range(0, 500, 2), batch_size, replace=False)
+def traffic_loss(fp, sample_points):
+    # pairs with the same start and end faces share one corridor
+    faces = fp.locate_points(sample_points)
+    tripaths = {}
 
-    traffic_loss = 0
+    # pairs in a straight line of sight need no search
+    graph = fp.get_face_graph()
+    xy = np.array([p.xy for p in sample_points])
+    ids = [-1 if f is None else graph.ids[f] for f in faces]
+    in_sight = graph.in_sight(xy[:-1], xy[1:], ids[:-1])
+
+    paths = []
     for i in range(0, len(sample_points) - 1):
         # for i in range(0, len(sample_points), 2):
         start = sample_points[i]
         end = sample_points[i + 1]
-        tripath = fp.find_tripath(start, end)
-        path = fp.simplify(tripath, start, end)
+        if in_sight[i]:
+            paths.append([start, end])
+            continue
+
+        key = (faces[i], faces[i + 1])
+        if key not in tripaths:
+            tripaths[key] = fp.find_face_path(*key)
+        path = fp.simplify(tripaths[key], start, end)
         if path:
-            traffic_loss += traffic_loss_func(path)
-    traffic_loss /= len(sample_points) / 2
+            paths.append(path)
+
+    # all path lengths in one batch
+    traffic_loss = np.sum(path_lengths(pad_paths(paths))) if paths else 0
+    return traffic_loss / (len(sample_points) / 2)
+
+
+def traffic_pair_loss(fp, start, end):
+    tripath = fp.find_tripath(start, end)
+    path = fp.simplify(tripath, start, end)
+    return (traffic_loss_func(path) if path else 0), tripath
+
 
-    # entrance loss
+def entrance_loss(fp, door_system):
     entrance_loss = 0
     st, end = None, []
     for door in door_system.ecs.doors.values():
@@ -109,8 +153,8 @@ def f(fp, sample_points, batch_size=50):
         else:
             end.append(Point(pos))
 
-    for e in end:
-        tripath = fp.find_tripath(st, e)
+    # one search from the front door to all doors
+    for e, tripath in zip(end, fp.find_tripaths(st, end)):
         path = fp.simplify(tripath, st, e)
         if path is None:
             print(f"Entrance path not found: {st.xy} -> {e.xy}")
@@ -118,7 +162,47 @@ def f(fp, sample_points, batch_size=50):
         else:
             entrance_loss += loss_func(path) / len(end)
 
-    return traffic_loss + 2 * entrance_loss
+    return entrance_loss
+
+
+def create_objective(door_system, traffic="path"):
+    """traffic: "path" for per-sample paths, "od" for the room/door graph"""
+    traffic_f = ODTrafficLoss(door_system) if traffic == "od" else traffic_loss
+
+    def f(fp, sample_points):
+        return traffic_f(fp, sample_points) + 2 * entrance_loss(fp, door_system)
+
+    return f
+
+
+def create_optimizer(fp, door_system, config, sample_points, case_id=None):
+    """
+    Optimizer selected by config.optimizer.
+    With a case_id, "mtm" scores its tries on worker processes.
+    "gibbs" rescores sample pairs, so it always uses per-sample paths.
+    """
+    if config.optimizer == "gibbs":
+        return GibbsMHOptimizer(
+            fp,
+            door_system,
+            traffic_pair_loss,
+            config.temperature,
+            sample_points,
+            global_f=lambda fp: 2 * entrance_loss(fp, door_system),
+        )
+    f = create_objective(door_system, config.traffic)
+    if config.optimizer == "mtm":
+        return MTMOptimizer(
+            fp,
+            door_system,
+            f,
+            config.temperature,
+            sample_points,
+            k=config.tries,
+            builder=None if case_id is None else build_case,
+            builder_args=(case_id,),
+        )
+    return MHOptimizer(fp, door_system, f, config.temperature, sample_points)
 
 
 if __name__ == "__main__":
@@ -130,10 +214,10 @@ if __name__ == "__main__":
 
     door_system = create_door_system(fp, config)
 
-    sample_points = make_sample_points(fp, config.sample_size)
+    sample_points = make_sample_points(fp, config.sample_size, config.sampler)
     # Metropolis-Hastings
     frames = []
-    mh = MHOptimizer(fp, door_system, f, config.temperature, sample_points)
+    mh = create_optimizer(fp, door_system, config, sample_points, case_id)
     mh.init()
 
     def draw_frame(i):
@@ -0,0 +1,86 @@
+"""
+Faces expanded per corridor query by A* and by bidirectional A*, on the
+layouts of configs.toml with their doors placed (by default the final_*
+cases). Both searches run on the same face graph and random sample
+pairs; their corridors must be equally short.
+
+    python e_path_benchmark.py --pairs 500 --landmarks 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import e_multi_optimize
+from u_loader import ULoader
+from u_path_finding import a_star_indexed, bidirectional_indexed
+
+
+def search(graph, start, end, method, expanded):
+    if method == "bidirectional":
+        return bidirectional_indexed(
+            graph.adjacency,
+            graph.blocked_in,
+            start,
+            end,
+            graph.potential(start, end),
+            expanded,
+        )
+    return a_star_indexed(
+        graph.adjacency, graph.heuristic(end), start, end, expanded
+    )
+
+
+def benchmark(case_id, n_pairs, n_landmarks=0, seed=0):
+    """None if the doors of the case cannot be placed"""
+    fp, config = e_multi_optimize.init_layout(case_id)
+    if not e_multi_optimize.doors_fit(fp, config):
+        return None
+    e_multi_optimize.create_door_system(fp, config)
+    fp.set_landmarks(n_landmarks)
+    graph = fp.get_face_graph()
+
+    points, faces = fp.sample_points(2 * n_pairs, np.random.default_rng(seed))
+    ids = np.array([graph.ids[f] for f in faces]).reshape(-1, 2)
+
+    stats = {}
+    for method in ["a_star", "bidirectional"]:
+        expanded, costs = [], []
+        t0 = time.perf_counter()
+        for start, end in ids:
+            costs.append(search(graph, start, end, method, expanded)[1])
+        stats[method] = (len(expanded), time.perf_counter() - t0, costs)
+
+    assert np.allclose(stats["a_star"][2], stats["bidirectional"][2])
+    return config.file_name, len(graph), stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, nargs="*", default=None)
+    parser.add_argument("--pairs", type=int, default=300)
+    parser.add_argument("--landmarks", type=int, default=0)
+    args = parser.parse_args()
+
+    ULoader.load_config()
+    case_ids = args.cases
+    if case_ids is None:
+        case_ids = [
+            i
+            for i in range(ULoader.get_case_count())
+            if ULoader.get_config(i).file_name.startswith("final_")
+        ]
+
+    print(f"{'case':<10} {'faces':>5} {'method':>13} {'faces/q':>8} {'ms':>7}")
+    for case_id in case_ids:
+        result = benchmark(case_id, args.pairs, args.landmarks)
+        if result is None:
+            print(f"{case_id:<10} skipped: a door between rooms without a wall")
+            continue
+        name, n_faces, stats = result
+        for method, (n_expanded, t, _) in stats.items():
+            print(
+                f"{name:<10} {n_faces:>5} {method:>13}"
+                f" {n_expanded / args.pairs:>8.1f} {t * 1e3:>7.1f}"
+            )
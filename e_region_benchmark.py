@@ -0,0 +1,83 @@
+"""
+Mesh size and path latency on the triangles and on their convex regions,
+on the layouts of configs.toml with their doors placed (by default the
+final_* cases). Both engines answer the same random sample pairs with
+the same face corridor: find_tripath + simplify funnels its faces,
+find_region_path the convex regions it crosses.
+
+    python e_region_benchmark.py --pairs 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import e_multi_optimize
+from g_primitives import Point
+from u_loader import ULoader
+
+
+def path_length(path):
+    xy = np.array([p.xy for p in path])
+    return np.sum(np.linalg.norm(np.diff(xy, axis=0), axis=1))
+
+
+def benchmark(case_id, n_pairs, seed=0):
+    """None if the doors of the case cannot be placed"""
+    fp, config = e_multi_optimize.init_layout(case_id)
+    if not e_multi_optimize.doors_fit(fp, config):
+        return None
+    e_multi_optimize.create_door_system(fp, config)
+    regions = fp.get_region_graph()
+
+    xy, _ = fp.sample_points(2 * n_pairs, np.random.default_rng(seed))
+    points = [Point(p) for p in xy]
+    pairs = list(zip(points[::2], points[1::2]))
+
+    def faces(start, end):
+        return fp.simplify(fp.find_tripath(start, end), start, end)
+
+    stats = {}
+    for name, find in [("faces", faces), ("regions", fp.find_region_path)]:
+        t0 = time.perf_counter()
+        paths = [find(start, end) for start, end in pairs]
+        stats[name] = (time.perf_counter() - t0, paths)
+
+    ratios = [
+        path_length(b) / path_length(a)
+        for a, b in zip(stats["faces"][1], stats["regions"][1])
+        if a is not None and b is not None and path_length(a) > 0
+    ]
+    sizes = {"faces": len(fp.get_face_graph()), "regions": len(regions)}
+    return config.file_name, sizes, stats, np.mean(ratios)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, nargs="*", default=None)
+    parser.add_argument("--pairs", type=int, default=300)
+    args = parser.parse_args()
+
+    ULoader.load_config()
+    case_ids = args.cases
+    if case_ids is None:
+        case_ids = [
+            i
+            for i in range(ULoader.get_case_count())
+            if ULoader.get_config(i).file_name.startswith("final_")
+        ]
+
+    print(f"{'case':<10} {'graph':>8} {'nodes':>6} {'ms/q':>7} {'length':>7}")
+    for case_id in case_ids:
+        result = benchmark(case_id, args.pairs)
+        if result is None:
+            print(f"{case_id:<10} skipped: a door between rooms without a wall")
+            continue
+        name, sizes, stats, ratio = result
+        for graph, (t, _) in stats.items():
+            length = 1.0 if graph == "faces" else ratio
+            print(
+                f"{name:<10} {graph:>8} {sizes[graph]:>6}"
+                f" {t * 1e3 / args.pairs:>7.3f} {length:>7.3f}"
+            )
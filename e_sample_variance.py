@@ -0,0 +1,47 @@
+"""
+Variance of the traffic loss estimate for i.i.d. and scrambled Halton
+sample points, at several sample sizes, on one case with fixed doors.
+Every (method, size) is repeated with independent random seeds; a lower
+standard deviation at the same size means fewer path queries for the
+same loss accuracy.
+
+    python e_sample_variance.py --case 2 --repeats 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import e_multi_optimize
+from g_primitives import Vertex as Point
+
+
+def estimate(fp, n, method, seed):
+    rng = np.random.default_rng(seed)
+    points, _ = fp.sample_points(n, rng=rng, method=method)
+    return e_multi_optimize.traffic_loss(fp, [Point(xy) for xy in points])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--case", type=int, default=2)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[16, 32, 64])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    fp, config = e_multi_optimize.init_layout(args.case)
+    e_multi_optimize.create_door_system(fp, config)
+
+    print(f"{'n':>5} {'method':>7} {'mean':>8} {'std':>8} {'s':>6}")
+    for n in args.sizes:
+        for method in ["random", "halton"]:
+            t0 = time.perf_counter()
+            losses = np.array(
+                [estimate(fp, n, method, seed) for seed in range(args.repeats)]
+            )
+            t = time.perf_counter() - t0
+            print(
+                f"{n:>5} {method:>7} {losses.mean():>8.4f}"
+                f" {losses.std():>8.4f} {t:>6.1f}"
+            )
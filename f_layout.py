@@ -1,7 +1,10 @@
-import numpy as np
-
 from f_primitives import FVertex, FEdge, FFace, FRoom
+from f_room_graph import RoomGraph
+from g_mesh import half_edge_twins
 from g_navmesh import NavMesh
+from g_primitives import _GeoBase
+import u_mesh_cache
+from u_obj_loader import UObjLoader
 
 
 class FLayout(NavMesh):
@@ -11,55 +14,181 @@ class FLayout(NavMesh):
 
         self.clear()
         self.rooms = set()
-        self.adj_m = None
+        self.room_graph = None  # set_room_connections
+        self.shared_walls = None  # (rid, rid) -> shared edges, both ways
 
     def init_rooms(self):
         """Create rooms from faces blocked by edges"""
+        self.__create_rooms(self.__flood_rooms())
+        return True
 
-        def visit_face(f, room):
-            if f.is_visited:
-                return
-            f.visit()
-            room.faces.add(f)
-            for fa in f.adjs:
-                if f.get_shared_edge(fa).is_blocked:
-                    continue
-                visit_face(fa, room)
-
+    def __flood_rooms(self):
+        """
+        Faces of every room in visiting order, in one linear pass.
+        Depth-first with an explicit stack, in the same order as a
+        recursive flood fill, so rooms keep their rids.
+        """
         self.reset_all_visit_status(self.faces)
+        order = list(self.faces)
+        last = len(order) - 1  # the last unvisited face seeds the next room
+        seed = self.faces.copy().pop() if order else None
+
+        rooms = []
+        while seed is not None:
+            seed.visit()
+            room = [seed]
+            stack = [(seed, iter(seed.adjs))]
+            while stack:
+                f, adjs = stack[-1]
+                for fa in adjs:
+                    if fa.is_visited or f.get_shared_edge(fa).is_blocked:
+                        continue
+                    fa.visit()
+                    room.append(fa)
+                    stack.append((fa, iter(fa.adjs)))
+                    break
+                else:
+                    stack.pop()
+            rooms.append(room)
+
+            while last >= 0 and order[last].is_visited:
+                last -= 1
+            seed = order[last] if last >= 0 else None
+        return rooms
+
+    def __create_rooms(self, room_faces):
         self.rooms = set()
-        not_visited = self.faces.copy()
-        while not_visited:
+        self.shared_walls = None
+        for faces in room_faces:
             room = FRoom()
-            visit_face(not_visited.pop(), room)
+            for f in faces:
+                f.visit()
+                room.add_face(f)
             self.rooms.add(room)
-            not_visited = [f for f in self.faces if not f.is_visited]
+
+    def from_obj_file(
+        self,
+        obj_path,
+        min_dist_to_constraint_edge=0.0,
+        cache_dir=u_mesh_cache.CACHE_DIR,
+    ):
+        """
+        Mesh and rooms of an OBJ file, through the on-disk mesh cache.
+        Same result as from_obj_data() followed by init_rooms().
+        """
+        path = u_mesh_cache.cache_path(
+            obj_path, min_dist_to_constraint_edge, cache_dir
+        )
+        cached = u_mesh_cache.load(path)
+        if cached is not None:
+            self.load_arrays(
+                cached["verts"],
+                cached["triangles"],
+                cached["fixed_edges"],
+                cached["twins"],
+            )
+            self.load_rooms(cached["room_faces"])
+            return True
+
+        obj_data = UObjLoader.load(obj_path)
+        verts, triangles, fixed_edges = self.triangulate(
+            obj_data.verts, obj_data.edges, min_dist_to_constraint_edge
+        )
+        twins = half_edge_twins(triangles)
+        self.load_arrays(verts, triangles, fixed_edges, twins)
+
+        room_faces = self.__flood_rooms()
+        self.__create_rooms(room_faces)
+
+        face_ids = {f: i for i, f in enumerate(self.__faces_in_order())}
+        u_mesh_cache.save(
+            path,
+            verts,
+            triangles,
+            twins,
+            fixed_edges,
+            [[face_ids[f] for f in faces] for faces in room_faces],
+        )
         return True
 
+    def load_rooms(self, room_faces):
+        """Create rooms from the face indices of every room, in rid order"""
+        faces = self.__faces_in_order()
+        self.__create_rooms([[faces[i] for i in ids] for ids in room_faces])
+        return True
+
+    def __faces_in_order(self):
+        """Faces in the order they were created from the triangles"""
+        return sorted(self.faces, key=lambda f: f.guid)
+
     def set_room_connections(self):
         assert len(self.rooms) > 0, "No rooms found"
 
-        adj_m = np.zeros((len(self.rooms), len(self.rooms)))
-        for wall in self.get_inner_walls():
+        walls = self.get_inner_walls()
+        for wall in walls:
             f1, f2 = wall.face, wall.twin.face
             r1 = self.__find_room_from_face(f1)
             r2 = self.__find_room_from_face(f2)
             r1.add_adj(r2)
             r2.add_adj(r1)
-            adj_m[r1.rid, r2.rid] = 1
-            adj_m[r2.rid, r1.rid] = 1
-        self.adj_m = adj_m
+        self.room_graph = RoomGraph.from_walls(self.rooms, walls)
         return True
 
     def __find_room_from_face(self, f):
-        for room in self.rooms:
-            if f in room.faces:
-                return room
-        return None
+        return f.room
+
+    def get_shared_walls(self, r0, r1):
+        """Edges between two rooms, as r0.get_shared_edges(r1)"""
+        if self.shared_walls is None:
+            self.set_shared_walls()
+        key = (r0.rid, r1.rid)
+        if key not in self.shared_walls:
+            self.shared_walls[key] = r0.get_shared_edges(r1)
+        return self.shared_walls[key]
+
+    def set_shared_walls(self):
+        """Shared edges of every pair of adjacent rooms in one pass"""
+        self.shared_walls = {}
+        for room in sorted(self.rooms, key=lambda r: r.rid):
+            self.__add_shared_walls(room)
+
+    def update_shared_walls(self, r0, r1):
+        """After a door split or merged the faces of r0 and r1"""
+        if self.shared_walls is None or r0 is None or r1 is None:
+            return
+        # the split faces may border any neighbor of r0 and r1, so every
+        # pair with one of them changes
+        changed = {r0, r1}
+        rids = {r0.rid, r1.rid}
+        self.shared_walls = {
+            key: edges
+            for key, edges in self.shared_walls.items()
+            if rids.isdisjoint(key)
+        }
+        for room in sorted(changed | r0.adjs | r1.adjs, key=lambda r: r.rid):
+            self.__add_shared_walls(room, None if room in changed else changed)
+
+    def __add_shared_walls(self, room, others=None):
+        """Shared edges from room to its neighbors (only to others)"""
+        for e in room.get_wall_edges():
+            other = e.twin.face.room if e.twin else None
+            if other is None or other is room:
+                continue
+            if others is not None and other not in others:
+                continue
+            key = (room.rid, other.rid)
+            self.shared_walls.setdefault(key, []).extend([e, e.twin])
 
     # utils
     def clear(self):
-        """Clear all vertices, edges, faces"""
+        """
+        Clear all vertices, edges, faces and rooms.
+        Ids and guids are process-wide, so this resets them for every
+        layout: only one layout can be in use at a time. Worker processes
+        each build their own layout.
+        """
+        _GeoBase.clear_all()  # guids order the sets that rooms come from
+        FRoom.clear()
         FFace.clear()
         FEdge.clear()
         FVertex.clear()
@@ -10,6 +10,7 @@ class _FInfo:
 class FVertex(Vertex, _FInfo):
     def __init__(self, xy):
         super().__init__(xy)
+        _FInfo.__init__(self)
 
     def __repr__(self):
         return f"FVertex {self.vid} ({self.xy[0]:.2f}, {self.xy[1]:.2f})"
@@ -18,6 +19,7 @@ class FVertex(Vertex, _FInfo):
 class FEdge(Edge, _FInfo):
     def __init__(self, origin, to):
         super().__init__(origin, to)
+        _FInfo.__init__(self)
 
     def __repr__(self):
         return f"FEdge {self.eid} ({self.ori.vid} -> {self.to.vid})"
@@ -26,6 +28,7 @@ class FEdge(Edge, _FInfo):
 class FFace(Face, _FInfo):
     def __init__(self):
         super().__init__()
+        _FInfo.__init__(self)
 
     def __repr__(self):
         return f"FFace {self.fid} (Verts {[v.vid for v in self.verts]})"
@@ -44,20 +47,29 @@ class FRoom(_FInfo, _GeoBase):
 
         self.faces = set()
         self.adjs = set()
+        self.__walls = None  # boundary edges, reset when the faces change
 
     def add_adj(self, room):
         self.adjs.add(room)
 
+    # face.room is kept in sync with the faces of the room
     def add_face(self, face):
         self.faces.add(face)
+        face.room = self
+        self.__walls = None
 
     def replace_face(self, old_face, new_face):
         self.faces.remove(old_face)
-        self.faces.add(new_face)
+        old_face.room = None
+        self.add_face(new_face)
 
     def remove_faces(self, faces):
         """Remove faces from room: no warning if face not in room"""
-        self.faces.difference_update(faces)
+        for f in faces:
+            if f in self.faces:
+                self.faces.remove(f)
+                f.room = None
+        self.__walls = None
 
     def get_all_edges(self):
         all_edges = set()
@@ -66,11 +78,16 @@ class FRoom(_FInfo, _GeoBase):
         return all_edges
 
     def get_wall_edges(self):
+        """Boundary edges of the room; cached, do not modify"""
+        if self.__walls is not None:
+            return self.__walls
+
         all_edges = self.get_all_edges()
         wall_edges = set()
         for e in all_edges:
             if e.twin is None or e.twin not in all_edges:
                 wall_edges.add(e)
+        self.__walls = wall_edges
         return wall_edges
 
     def get_area(self):
@@ -99,6 +116,11 @@ class FRoom(_FInfo, _GeoBase):
     def get_by_rid(self, rid):
         return self.get_by_(FRoom.__room_list, rid)
 
+    @staticmethod
+    def clear():
+        FRoom.__room_list = []
+        FRoom.__rid = 0
+
     def __repr__(self):
         return f"FRoom {self.rid} (Faces {[f.fid for f in self.faces]}, Adjs {[r.rid for r in self.adjs]})"
 
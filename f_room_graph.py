@@ -0,0 +1,104 @@
+"""
+Sparse weighted graph of the rooms of a layout.
+Adjacent rooms are stored in CSR arrays indexed by rid, with one weight
+per stored edge, so memory grows with the walls and not with rooms^2.
+to_csr() hands any weight to scipy.sparse.csgraph (scipy is optional):
+
+    from scipy.sparse.csgraph import dijkstra
+    dist = dijkstra(fp.room_graph.to_csr("centroid"), indices=[0])
+"""
+
+import numpy as np
+
+
+class RoomGraph:
+    """
+    Weights of the edge rid -> indices[k], k in indptr[rid]:indptr[rid+1]:
+        wall: length of the walls the two rooms share
+        centroid: distance between the room centers
+        door: center -> door -> center through the shortest active door
+              between the rooms (inf without one, see set_doors)
+    """
+
+    WEIGHTS = ("wall", "centroid", "door")
+
+    def __init__(self, n_rooms, src, dst, wall_len, centers):
+        src, dst = np.asarray(src, dtype=int), np.asarray(dst, dtype=int)
+        key = src * n_rooms + dst
+        pairs, inverse = np.unique(key, return_inverse=True)
+        rows = pairs // n_rooms
+
+        self.n = n_rooms
+        self.indices = pairs % n_rooms
+        self.indptr = np.searchsorted(rows, np.arange(n_rooms + 1))
+        self.centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+
+        self.wall = np.bincount(inverse, wall_len, minlength=len(pairs))
+        self.centroid = np.linalg.norm(
+            self.centers[rows] - self.centers[self.indices], axis=1
+        )
+        self.portals = np.full((len(pairs), 2), np.nan)  # door centers
+        self.door = np.full(len(pairs), np.inf)
+
+    @classmethod
+    def from_walls(cls, rooms, walls):
+        """Graph of rooms (rids 0..n-1) from walls between room faces"""
+        rooms = sorted(rooms, key=lambda r: r.rid)
+        src, dst, length = [], [], []
+        for e in walls:
+            r0, r1 = e.face.room.rid, e.twin.face.room.rid
+            half = e.get_length() / 2  # both ways; the twin adds the rest
+            src += [r0, r1]
+            dst += [r1, r0]
+            length += [half, half]
+        centers = [r.get_center() for r in rooms]
+        return cls(len(rooms), src, dst, length, centers)
+
+    def neighbors(self, rid):
+        return self.indices[self.indptr[rid] : self.indptr[rid + 1]]
+
+    def edge(self, r0, r1):
+        """Index of the edge r0 -> r1 in the weight arrays, -1 if none"""
+        lo, hi = self.indptr[r0], self.indptr[r0 + 1]
+        k = lo + np.searchsorted(self.indices[lo:hi], r1)
+        return k if k < hi and self.indices[k] == r1 else -1
+
+    def weights(self, weight="centroid"):
+        assert weight in self.WEIGHTS, f"Unknown weight {weight}"
+        return getattr(self, weight)
+
+    def set_doors(self, system):
+        """Portals and door weights from the active doors of a DoorSystem"""
+        self.portals[:] = np.nan
+        self.door[:] = np.inf
+        for door_comp in system.ecs.doors.values():
+            if not door_comp.is_active or None in door_comp.bind_rooms:
+                continue
+            xy = system.ratio_to_xy(door_comp, door_comp.ratio)
+            r0, r1 = (r.rid for r in door_comp.bind_rooms)
+            cost = np.linalg.norm(self.centers[r0] - xy) + np.linalg.norm(
+                self.centers[r1] - xy
+            )
+            for k in (self.edge(r0, r1), self.edge(r1, r0)):
+                if k >= 0 and cost < self.door[k]:
+                    self.door[k] = cost
+                    self.portals[k] = xy
+
+    def to_csr(self, weight="centroid"):
+        """scipy.sparse.csr_matrix of a weight, without self loops or inf"""
+        from scipy.sparse import csr_matrix
+
+        data = self.weights(weight)
+        rows = np.repeat(np.arange(self.n), np.diff(self.indptr))
+        keep = np.isfinite(data) & (rows != self.indices)
+        return csr_matrix(
+            (data[keep], (rows[keep], self.indices[keep])),
+            shape=(self.n, self.n),
+        )
+
+    def to_dense(self):
+        """(rooms, rooms) 0/1 adjacency matrix"""
+        adj_m = np.zeros((self.n, self.n))
+        rows = np.repeat(np.arange(self.n), np.diff(self.indptr))
+        adj_m[rows, self.indices] = 1
+        return adj_m
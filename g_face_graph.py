@@ -0,0 +1,271 @@
+"""
+Face adjacency of a mesh as flat arrays, for searches over integer ids.
+Faces are numbered in fid order, so ids compare like the faces do. The
+neighbors of every face are stored in CSR form (indptr, indices) in the
+order face.neighbors yields them, with the blocked flag of the shared
+edge (from both sides) and the distance between the face centers.
+A door split only rebuilds the rows of the faces around it.
+
+Optional landmarks (ALT): exact walking distances from a few faces give
+the lower bound |d(L, end) - d(L, f)| by the triangle inequality, which
+is much tighter than the straight line when walls force detours.
+The distances are taken with the edges of the faces that ever moved
+counted as 0, so they stay a lower bound while doors slide; only new
+faces moving or a change of the faces recomputes them.
+"""
+
+import numpy as np
+
+from u_path_finding import dijkstra_indexed
+
+
+def center_distances(a, b):
+    """|a - b| per row, rounded as np.linalg.norm of a single vector"""
+    d = np.asarray(a) - np.asarray(b)
+    return np.sqrt((d[:, None, :] @ d[:, :, None]).ravel())
+
+
+class FaceGraph:
+    def __init__(self, faces, n_landmarks=0):
+        self.faces = sorted(faces)
+        self.n_landmarks = n_landmarks
+        self.landmarks = None  # face ids, picked on the first heuristic
+        self.landmark_dist = None  # (landmarks, faces) walking distances
+        self.moved = np.zeros(len(self.faces), dtype=bool)  # since built
+        self.ids = {f: i for i, f in enumerate(self.faces)}
+
+        entries, across, corners = self.__face_rows(self.faces)
+        self.__set_rows(*entries, across)
+        self.__set_geometry(corners)
+
+    def __face_rows(self, faces):
+        """
+        CSR entries (rows, indices, blocked) of the faces in order, the
+        face across each of their edges (-1 if blocked or outer) and
+        their corners
+        """
+        rows, indices, blocked, across = [], [], [], []
+        for f in faces:
+            i = self.ids[f]
+            for f_adj in f.neighbors:
+                rows.append(i)
+                indices.append(self.ids[f_adj])
+                blocked.append(f.get_shared_edge(f_adj).is_blocked)
+            for e in f.edges:
+                is_open = e.twin is not None and not e.is_blocked
+                across.append(self.ids[e.twin.face] if is_open else -1)
+        entries = (
+            np.array(rows, dtype=int),
+            np.array(indices, dtype=int),
+            np.array(blocked, dtype=bool),
+        )
+        across = np.array(across, dtype=int).reshape(-1, 3)
+        corners = np.array([[v.xy for v in f.verts] for f in faces])
+        return entries, across, corners.reshape(-1, 3, 2)
+
+    def __set_rows(self, rows, indices, blocked, across):
+        """CSR arrays from entries grouped by row"""
+        n = len(self.faces)
+        self.indptr = np.searchsorted(rows, np.arange(n + 1))
+        self.indices = indices
+        self.blocked = blocked
+        self.rows = rows
+        self.across = across
+
+        # blocked flag of the reversed entry (indices[k] -> rows[k])
+        key = rows * n + indices
+        order = np.argsort(key)
+        reverse = order[np.searchsorted(key[order], indices * n + rows)]
+        self.blocked_in = self.blocked[reverse].tolist()
+
+    def update_faces(self, added=(), removed=()):
+        """
+        After faces were added to or removed from the mesh (door splits):
+        rebuilds the rows of the faces next to them and keeps the others.
+        A face both added and removed since the last update is ignored.
+        """
+        removed = set(removed)
+        added = sorted(f for f in added if f not in removed)
+        removed = set(f for f in removed if f in self.ids)
+        if not added and not removed:
+            return
+
+        # only the faces next to an added or removed face change
+        gone = np.zeros(len(self.faces), dtype=bool)
+        gone[[self.ids[f] for f in removed]] = True
+        changed = set(added)
+        changed.update(f_adj for f in added for f_adj in f.neighbors)
+        for i in np.flatnonzero(gone):
+            lo, hi = self.indptr[i], self.indptr[i + 1]
+            changed.update(self.faces[j] for j in self.indices[lo:hi])
+        changed = sorted(changed - removed)
+        rebuilt = gone.copy()
+        rebuilt[[self.ids[f] for f in changed if f in self.ids]] = True
+
+        # new ids, still in fid order; new faces usually come last
+        kept = np.flatnonzero(~gone)
+        faces = [self.faces[i] for i in kept]
+        remap = np.full(len(self.faces), -1)
+        if not faces or not added or faces[-1] < added[0]:
+            remap[kept] = np.arange(len(kept))
+            faces += added
+        else:
+            faces = sorted(faces + added)
+            ids = {f: i for i, f in enumerate(faces)}
+            remap[kept] = [ids[self.faces[i]] for i in kept]
+        same = np.flatnonzero(~rebuilt)
+        same_ids = remap[same]
+        self.faces = faces
+        self.ids = {f: i for i, f in enumerate(faces)}
+
+        # kept rows under their new ids, then the rebuilt rows
+        (rows, indices, blocked), across, corners = self.__face_rows(changed)
+        keep = ~rebuilt[self.rows]
+        rows = np.concatenate([remap[self.rows[keep]], rows])
+        indices = np.concatenate([remap[self.indices[keep]], indices])
+        blocked = np.concatenate([self.blocked[keep], blocked])
+        order = np.argsort(rows, kind="stable")
+
+        changed_ids = [self.ids[f] for f in changed]
+        all_across = np.empty((len(faces), 3), dtype=int)
+        same_across = self.across[same]
+        all_across[same_ids] = np.where(
+            same_across >= 0, remap[same_across], -1
+        )
+        all_across[changed_ids] = across
+        all_corners = np.empty((len(faces), 3, 2))
+        all_corners[same_ids] = self.corners[same]
+        all_corners[changed_ids] = corners
+
+        moved = np.zeros(len(faces), dtype=bool)
+        moved[same_ids] = self.moved[same]
+        moved[[self.ids[f] for f in added]] = True  # new door faces move
+        self.moved = moved
+
+        self.__set_rows(rows[order], indices[order], blocked[order], all_across)
+        self.__set_geometry(all_corners)
+        self.landmark_dist = None  # other faces, same landmarks
+        if self.landmarks is not None:  # same faces while all of them remain
+            landmarks = remap[self.landmarks]
+            found = (landmarks >= 0).all()
+            self.landmarks = landmarks.tolist() if found else None
+
+    def update_geometry(self, verts=None):
+        """
+        Centers and weights after vertices moved (same topology); with
+        the moved verts, only the corners of their faces are read again.
+        """
+        if verts is None:
+            corners = [[v.xy for v in f.verts] for f in self.faces]
+            self.__set_geometry(np.array(corners).reshape(-1, 3, 2))
+            self.landmark_dist = None
+            return
+        corners = self.corners.copy()
+        faces = set(f for v in verts for f in v.faces if f in self.ids)
+        ids = [self.ids[f] for f in faces]
+        for i in ids:
+            corners[i] = [v.xy for v in self.faces[i].verts]
+        self.__set_geometry(corners)
+        if not self.moved[ids].all():  # distances only bound the others
+            self.moved[ids] = True
+            self.landmark_dist = None
+
+    def __set_geometry(self, corners):
+        self.corners = corners
+        self.centers = np.average(self.corners, axis=1)
+        self.weights = center_distances(
+            self.centers[self.rows], self.centers[self.indices]
+        )
+
+        # plain lists for the per-element access of the search loop
+        self.adjacency = (
+            self.indptr.tolist(),
+            self.indices.tolist(),
+            self.blocked.tolist(),
+            self.weights.tolist(),
+        )
+
+    def __len__(self):
+        return len(self.faces)
+
+    def in_sight(self, starts, ends, start_ids):
+        """
+        Whether each segment starts[i] -> ends[i] stays inside the mesh,
+        walking from face start_ids[i] (-1: outside) through unblocked
+        edges; all segments walk together. Same test as
+        NavMesh.walk_segment: a segment through a vertex is not in sight.
+        """
+        starts, ends = np.asarray(starts), np.asarray(ends)
+        face = np.asarray(start_ids).copy()
+        result = np.zeros(len(face), dtype=bool)
+        active = np.flatnonzero(face >= 0)
+
+        def cross(o, a, b):
+            return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (
+                b[..., 0] - o[..., 0]
+            ) * (a[..., 1] - o[..., 1])
+
+        for _ in range(len(self.faces)):
+            if len(active) == 0:
+                break
+            a = self.corners[face[active]]  # edge k: a[k] -> b[k], c opposite
+            b, c = np.roll(a, -1, axis=1), np.roll(a, -2, axis=1)
+            s, e = starts[active, None], ends[active, None]
+
+            beyond = cross(a, b, e) * cross(a, b, c) < 0
+            sa, sb = cross(s, e, a), cross(s, e, b)
+            vertex = (beyond & ((sa == 0) | (sb == 0))).any(axis=1)
+            exits = beyond & ((sa > 0) != (sb > 0))
+
+            arrived = ~beyond.any(axis=1)
+            result[active[arrived]] = True
+            k = np.argmax(exits, axis=1)
+            nxt = self.across[face[active], k]
+            moving = ~arrived & ~vertex & exits.any(axis=1) & (nxt >= 0)
+            face[active[moving]] = nxt[moving]
+            active = active[moving]
+        return result
+
+    def heuristic(self, end):
+        """Lower bound of the walking distance of every face to face id end"""
+        return self.lower_bounds(end).tolist()
+
+    def potential(self, start, end):
+        """Average potential of bidirectional A* between two face ids"""
+        return (
+            (self.lower_bounds(end) - self.lower_bounds(start)) / 2
+        ).tolist()
+
+    def lower_bounds(self, end):
+        h = center_distances(self.centers, self.centers[end])
+        if self.n_landmarks > 0:
+            if self.landmark_dist is None:
+                self.set_landmarks()
+            d = self.landmark_dist
+            with np.errstate(invalid="ignore"):
+                bound = np.abs(d - d[:, end, None])
+            # inf: other component than end; nan: landmark reaches neither
+            h = np.maximum(h, np.nan_to_num(bound, nan=0.0).max(axis=0))
+        return h
+
+    def set_landmarks(self):
+        """
+        Walking distances from n_landmarks faces, picked farthest first:
+        each landmark is the face farthest from the ones before (from
+        face 0 for the first). Edges of moved faces count as 0.
+        """
+        n = min(self.n_landmarks, len(self.faces))
+        still = ~(self.moved[self.rows] | self.moved[self.indices])
+        adjacency = self.adjacency[:3] + ((self.weights * still).tolist(),)
+        if self.landmarks is None:
+            landmarks, dist = [], []
+            nearest = np.array(dijkstra_indexed(adjacency, 0))
+            for _ in range(n):
+                far = np.where(np.isfinite(nearest), nearest, -1.0)
+                landmarks.append(int(np.argmax(far)))
+                dist.append(dijkstra_indexed(adjacency, landmarks[-1]))
+                nearest = np.min(dist, axis=0)
+            self.landmarks = landmarks
+        else:  # after faces moved or changed: same faces, new distances
+            dist = [dijkstra_indexed(adjacency, i) for i in self.landmarks]
+        self.landmark_dist = np.array(dist).reshape(n, len(self.faces))
@@ -1,3 +1,5 @@
+import numpy as np
+
 from g_primitives import Vertex, Edge, Face
 from u_cdt import CDT
 from u_obj_loader import UObjData
@@ -65,27 +67,38 @@ class Mesh:
         self.create(obj_data.verts, obj_data.edges)
 
     def create(self, vertices, edges, min_dist_to_constraint_edge=0.0):
+        nodes, triangles, fixed_edges = self.triangulate(
+            vertices, edges, min_dist_to_constraint_edge
+        )
+        self.load_arrays(nodes, triangles, fixed_edges)
+
+    def triangulate(self, vertices, edges, min_dist_to_constraint_edge=0.0):
+        """CDT of the outline: (vertices, triangles, fixed edges) arrays"""
         self.cdt = CDT(min_dist_to_constraint_edge)
         self.cdt.insert_vertices(vertices)
         self.cdt.insert_edges(edges)
         self.cdt.erase_outer_triangles()
         # self.cdt.erase_outer_triangles_and_holes()  # hole is also needed
 
-        self.fixed_edges = self.cdt.get_fixed_edges(to_numpy=True)
+        fixed_edges = self.cdt.get_fixed_edges(to_numpy=True)
         triangles = self.cdt.get_triangles(to_numpy=True)
         vertices = self.cdt.get_vertices(to_numpy=True)
-
-        self.gen_mesh(vertices, triangles)
         del self.cdt
+        return vertices, triangles, fixed_edges
 
-    def gen_mesh(self, nodes, faces):
+    def load_arrays(self, nodes, triangles, fixed_edges, twins=None):
+        """Build the half-edge structure from triangulation arrays"""
+        self.fixed_edges = fixed_edges
+        self.gen_mesh(nodes, triangles, twins)
+
+    def gen_mesh(self, nodes, faces, twins=None):
         # self.clear()
 
         self.verts, self.edges, self.faces = [], [], []
         self.__init_nodes(nodes)
         self.__init_faces(faces)
         self.__init_half_edges(faces)
-        self.__post_processing()
+        self.__post_processing(faces, twins)
 
         self.__all_to_set()
 
@@ -121,24 +134,16 @@ class Mesh:
             self.verts[fj].add_edges([eij, ejk])
             self.verts[fk].add_edges([ejk, eki])
 
-    def __post_processing(self):
-        self.__set_twins()
+    def __post_processing(self, faces, twins=None):
+        if twins is None:
+            twins = half_edge_twins(faces)
+        self.__set_twins(twins)
         self.__set_fixed_edges()
 
-    def __set_twins(self):
-        n = len(self.edges)
-        for i in range(n):
-            ei = self.edges[i]
-            if ei.twin:
-                continue
-
-            for j in range(i + 1, n):
-                ej = self.edges[j]
-                if ej.twin:
-                    continue
-
-                if ei.ori == ej.to and ei.to == ej.ori:
-                    ei.twin, ej.twin = ej, ei
+    def __set_twins(self, twins):
+        for e, i in zip(self.edges, twins):
+            if i >= 0:
+                e.twin = self.edges[i]
 
     def __set_fixed_edges(self):
         for fe in self.fixed_edges:
@@ -164,3 +169,84 @@ class Mesh:
         self.faces = set(self.faces)
         self.border_edges = set(self.border_edges)
         self.inner_fixed_edges = set(self.inner_fixed_edges)
+
+
+def half_edge_twins(faces):
+    """
+    Twin of every half-edge, -1 on the border.
+    Half-edge 3 * i + k goes from corner k to corner k + 1 of face i,
+    the order in which Mesh creates them.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    ori = faces.ravel()
+    to = np.roll(faces, -1, axis=1).ravel()
+    if len(ori) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # directed edge keys, looked up in reverse direction
+    n = int(faces.max()) + 1
+    keys = ori * n + to
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    reverse = to * n + ori
+    pos = np.minimum(np.searchsorted(sorted_keys, reverse), len(keys) - 1)
+    return np.where(sorted_keys[pos] == reverse, order[pos], -1)
+
+
+def convex_regions(faces, can_merge=None):
+    """
+    Hertel-Mehlhorn: merge triangles into convex polygons over open
+    edges, keeping blocked ones and those can_merge(e) rejects.
+    Returns the faces in fid order and their region ids (0..regions-1,
+    numbered by their first face).
+    """
+    faces = sorted(f for f in faces if f is not None and not f.flipped)
+    ids = {f: i for i, f in enumerate(faces)}
+    parent = list(range(len(faces)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # angle of every region at its vertices, and its blocked edges
+    angles, walls = [], []
+    for f in faces:
+        corners = {}
+        for e in f.edges:
+            d_out, d_in = e.to.xy - e.ori.xy, e.prev.ori.xy - e.ori.xy
+            cross = d_out[0] * d_in[1] - d_out[1] * d_in[0]
+            corners[e.ori] = np.arctan2(cross, d_out @ d_in)
+        angles.append(corners)
+        walls.append(
+            {frozenset((e.ori, e.to)) for e in f.edges if e.is_blocked}
+        )
+
+    def is_convex(angle):  # at the border, or inside the merged polygon
+        return angle <= np.pi + 1e-9 or angle >= 2 * np.pi - 1e-9
+
+    for f in faces:
+        for e in f.edges:
+            if e.twin is None or e.is_blocked or e.twin.face not in ids:
+                continue
+            if can_merge is not None and not can_merge(e):
+                continue
+            a, b = find(ids[f]), find(ids[e.twin.face])
+            if a == b:
+                continue
+            if walls[a] & walls[b]:
+                continue  # the wall would end up inside the polygon
+            shared = angles[a].keys() & angles[b].keys()
+            if all(is_convex(angles[a][v] + angles[b][v]) for v in shared):
+                if len(angles[a]) < len(angles[b]):
+                    a, b = b, a
+                for v, angle in angles[b].items():
+                    angles[a][v] = angles[a].get(v, 0.0) + angle
+                walls[a] |= walls[b]
+                angles[b] = walls[b] = None
+                parent[b] = a
+
+    roots = [find(i) for i in range(len(faces))]
+    _, first, labels = np.unique(roots, return_index=True, return_inverse=True)
+    return faces, np.argsort(np.argsort(first))[labels]
@@ -1,19 +1,185 @@
 import numpy as np
 
+from g_face_graph import FaceGraph
 from g_mesh import Mesh
 from g_primitives import Vertex, Point, Face
-from u_path_finding import a_star
+from g_region_graph import RegionGraph
+from g_visibility import VisibilityGraph
+from u_path_finding import (
+    a_star,
+    a_star_indexed,
+    bidirectional_indexed,
+    dijkstra_many,
+)
+from u_qmc import scrambled_halton
 
 
 class NavMesh(Mesh):
     def __init__(self):
         super().__init__()
+        self.face_graph = None  # built on the first search
+        self.face_changes = ([], [])  # faces added, removed since then
+        self.n_landmarks = 0  # ALT heuristic of the face graph if > 0
+        self.visibility = None  # built on the first corner path
+        self.regions = None  # built on the first region path
 
-    def find_tripath(self, start, end, dist_func=None):
+    # the face graph follows door splits on the next search, the other
+    # graphs are rebuilt
+    def append(self, v=None, e=None, f=None):
+        super().append(v, e, f)
+        if self.face_graph is not None and f:
+            self.face_changes[0].extend(f)
+        self.visibility = self.regions = None
+
+    def remove(self, v_list=None, e_list=None, f_list=None):
+        super().remove(v_list, e_list, f_list)
+        if self.face_graph is not None and f_list:
+            self.face_changes[1].extend(f_list)
+        self.visibility = self.regions = None
+
+    def load_arrays(self, nodes, triangles, fixed_edges, twins=None):
+        super().load_arrays(nodes, triangles, fixed_edges, twins)
+        self.reset_face_graph()
+        self.visibility = self.regions = None
+
+    def set_landmarks(self, n_landmarks):
+        """Search with landmark lower bounds (0: straight line only)"""
+        self.n_landmarks = n_landmarks
+        self.reset_face_graph()
+
+    def reset_face_graph(self):
+        self.face_graph = None
+        self.face_changes = ([], [])
+
+    def get_face_graph(self):
+        if self.face_graph is None:
+            self.face_graph = FaceGraph(self.faces, self.n_landmarks)
+        elif self.face_changes[0] or self.face_changes[1]:
+            self.face_graph.update_faces(*self.face_changes)
+        self.face_changes = ([], [])
+        return self.face_graph
+
+    def get_visibility_graph(self):
+        if self.visibility is None:
+            self.visibility = VisibilityGraph(self.faces)
+        return self.visibility
+
+    def moved_verts(self, verts=None):
+        """
+        Call after moving vertices without changing the topology. With
+        the moved verts, the face graph only reads their faces again and
+        the visibility graph is updated, not rebuilt.
+        """
+        if self.face_graph is not None:
+            self.get_face_graph().update_geometry(verts)
+        if self.visibility is not None:
+            if verts is None:
+                self.visibility = None
+            else:
+                self.visibility.update(verts)
+        if self.regions is not None and not self.regions.update_geometry():
+            self.regions = None  # not convex anymore
+
+    def find_corner_path(self, start: Point, end: Point):
+        """
+        Shortest path on the visibility graph of the wall corners, or
+        None. Unlike find_tripath + simplify, the path does not follow
+        one corridor, so it is the shortest over all of them.
+        """
+        if not self.is_inside(start) or not self.is_inside(end):
+            return None
+        return self.get_visibility_graph().find_path(start, end)
+
+    def get_region_graph(self):
+        if self.regions is None:
+            self.regions = RegionGraph(self.faces, same_room)
+        return self.regions
+
+    def find_region_path(self, start: Point, end: Point):
+        """
+        find_tripath + simplify with the funnel over the convex regions the
+        corridor crosses: fewer portals, and never a longer path.
+        """
+        tripath = self.find_tripath(start, end)
+        if tripath is None:
+            return None
+        portals = self.get_region_graph().find_portals(tripath)
+        return self.funnel_portals(portals, start, end)
+
+    def find_tripath(self, start, end, dist_func=None, method="a_star"):
         f_start = self.get_point_inside_face(start)
+        if dist_func is None:
+            tripath = self.walk_segment(start, end, f_start)
+            if tripath is not None:  # in sight: no search needed
+                return tripath
         f_end = self.get_point_inside_face(end)
-        path = a_star(f_start, f_end, dist_func)[0]
-        return path
+        return self.find_face_path(f_start, f_end, dist_func, method)
+
+    def find_tripaths(self, start, ends, dist_func=None):
+        """Corridors from one point to many, with a single search"""
+        f_start = self.get_point_inside_face(start)
+        f_ends = [self.get_point_inside_face(end) for end in ends]
+        return dijkstra_many(f_start, f_ends, dist_func)
+
+    def find_face_path(self, f_start, f_end, dist_func=None, method="a_star"):
+        """
+        Corridor of faces between two located faces.
+        method="bidirectional" runs A* from both ends, which expands
+        fewer faces for long corridors; the corridor is as short, but
+        may differ among equally short ones. On small plans it is slower:
+        on final_2 it expands 18.0 faces per query against 17.5 for A*
+        and takes about 1.5x as long (e_path_benchmark.py), so A* is the
+        default.
+        """
+        if dist_func is not None or f_start is None or f_end is None:
+            return a_star(f_start, f_end, dist_func)[0]
+
+        graph = self.get_face_graph()
+        start, end = graph.ids[f_start], graph.ids[f_end]
+        if method == "bidirectional":
+            path, _ = bidirectional_indexed(
+                graph.adjacency,
+                graph.blocked_in,
+                start,
+                end,
+                graph.potential(start, end),
+            )
+        else:
+            path, _ = a_star_indexed(
+                graph.adjacency, graph.heuristic(end), start, end
+            )
+        return None if path is None else [graph.faces[i] for i in path]
+
+    def walk_segment(self, start: Point, end: Point, f_start=None):
+        """
+        Faces crossed by the segment start -> end, from the face of start
+        through unblocked edges; None if a blocked or outer edge is in the
+        way. The walk also gives up (None) when the segment runs exactly
+        through a vertex, leaving such pairs to the search.
+        """
+        f = f_start
+        if f is None:
+            f = self.get_point_inside_face(start)
+        tripath = []
+        while f is not None and len(tripath) <= len(self.faces):
+            tripath.append(f)
+            exit_edge = None
+            for e in f.edges:
+                a, b, c = e.ori, e.to, e.next.to
+                side = triarea2(a, b, end) * triarea2(a, b, c)
+                if side >= 0:
+                    continue  # end is not beyond this edge
+                sa, sb = triarea2(start, end, a), triarea2(start, end, b)
+                if sa == 0 or sb == 0:
+                    return None
+                if (sa > 0) != (sb > 0):
+                    exit_edge = e
+            if exit_edge is None:
+                return tripath  # end is in f
+            if exit_edge.is_blocked or exit_edge.twin is None:
+                return None
+            f = exit_edge.twin.face
+        return None
 
     def simplify(self, tripath, start: Point, end: Point):
         if tripath is None:
@@ -29,6 +195,35 @@ class NavMesh(Mesh):
                 return f
         return None
 
+    def locate_points(self, points):
+        """
+        get_point_inside_face for many points at once (None if outside).
+        Ties on shared edges go to the first face, as in the loop.
+        """
+        faces = [f for f in self.faces if f is not None and not f.flipped]
+        corners = np.array([[v.xy for v in f.verts] for f in faces])
+        xy = np.array([p.xy if isinstance(p, Vertex) else p for p in points])
+
+        # same barycentric test as is_inside_face, points x faces
+        v0 = corners[:, 1] - corners[:, 0]
+        v1 = corners[:, 2] - corners[:, 0]
+        v2 = xy[:, None, :] - corners[None, :, 0]
+        d00 = v0[:, 0] * v0[:, 0] + v0[:, 1] * v0[:, 1]
+        d01 = v0[:, 0] * v1[:, 0] + v0[:, 1] * v1[:, 1]
+        d11 = v1[:, 0] * v1[:, 0] + v1[:, 1] * v1[:, 1]
+        d20 = v2[..., 0] * v0[:, 0] + v2[..., 1] * v0[:, 1]
+        d21 = v2[..., 0] * v1[:, 0] + v2[..., 1] * v1[:, 1]
+
+        denom = d00 * d11 - d01 * d01
+        v = (d11 * d20 - d01 * d21) / denom
+        w = (d00 * d21 - d01 * d20) / denom
+        u = 1.0 - v - w
+        inside = (v >= 0) & (w >= 0) & (u >= 0)
+
+        first = np.argmax(inside, axis=1)
+        found = inside[np.arange(len(xy)), first]
+        return [faces[i] if ok else None for i, ok in zip(first, found)]
+
     def is_inside(self, point):
         return self.get_point_inside_face(point) is not None
 
@@ -57,6 +252,72 @@ class NavMesh(Mesh):
         # Check if point is inside triangle
         return v >= 0 and w >= 0 and u >= 0
 
+    # ----------------- Sampling -----------------
+    def sample_points(self, n, rng=None, method="random"):
+        """
+        n points distributed uniformly over the area of the mesh.
+        Returns (points (n, 2), faces): the face that contains each point.
+        method="halton" uses a scrambled Halton sequence; points (2k, 2k+1)
+        are then drawn jointly, so consecutive pairs cover the
+        origin-destination space evenly.
+        """
+        rng = np.random if rng is None else rng
+        if method == "halton":
+            # 2 dimensions per point (the remainder of the face pick is
+            # reused for the barycentrics), 4 per pair. Pairs are shuffled
+            # so that (2k+1, 2k+2) joins two unrelated pairs.
+            u = scrambled_halton((n + 1) // 2, 4, rng)
+            u = u[rng.permutation(len(u))].reshape(-1, 2)[:n]
+        else:
+            u = np.stack([rng.random(n), rng.random(n), rng.random(n)], 1)
+        return self.__sample(u, *self.__area_table())
+
+    def iter_sample_points(self, batch_size=256, rng=None):
+        """
+        Endless (point, face) stream of sample_points().
+        The area table is built once: restart after the mesh changes.
+        """
+        rng = np.random if rng is None else rng
+        table = self.__area_table()
+        while True:
+            u = rng.random((3, batch_size)).T
+            yield from zip(*self.__sample(u, *table))
+
+    def __area_table(self):
+        """Faces with positive area, their corners and cumulative areas"""
+        faces = [f for f in sorted(self.faces) if not f.flipped]
+        corners = np.array([[v.xy for v in f.verts] for f in faces])
+        ab, ac = corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+        area = (ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0]) / 2
+        return faces, corners, np.cumsum(area)
+
+    @staticmethod
+    def __sample(u, faces, corners, cum_area):
+        """
+        Map uniform variates to points: face by area, then barycentric.
+        u is (n, 3), or (n, 2) to reuse the remainder of the face pick.
+        """
+        # face by area: O(log F) per point
+        pick = u[:, 0] * cum_area[-1]
+        idx = np.searchsorted(cum_area, pick, side="right")
+        idx = np.minimum(idx, len(faces) - 1)
+
+        if u.shape[1] == 2:
+            lo = np.where(idx > 0, cum_area[idx - 1], 0.0)
+            r = np.clip((pick - lo) / (cum_area[idx] - lo), 0.0, 1.0)
+            s, t = np.sqrt(r), u[:, 1]
+        else:
+            s, t = np.sqrt(u[:, 1]), u[:, 2]
+
+        # uniform barycentric coordinates
+        a, b, c = corners[idx, 0], corners[idx, 1], corners[idx, 2]
+        points = (
+            (1 - s)[:, None] * a
+            + (s * (1 - t))[:, None] * b
+            + (s * t)[:, None] * c
+        )
+        return points, [faces[i] for i in idx]
+
     def get_portals(self, tripath):
         portals = []
         for i in range(len(tripath) - 1):
@@ -69,7 +330,10 @@ class NavMesh(Mesh):
         return portals
 
     def funnel_algorithm(self, tripath, start: Vertex, end: Vertex):
-        raw_portals = self.get_portals(tripath)
+        return self.funnel_portals(self.get_portals(tripath), start, end)
+
+    def funnel_portals(self, raw_portals, start: Vertex, end: Vertex):
+        """Shortest path through (left, right) portals, see funnel_algorithm"""
         portals = raw_portals + [(end, end)]
 
         path = [start]
@@ -80,9 +344,17 @@ class NavMesh(Mesh):
         while i < len(portals):
             left_pt, right_pt = portals[i]
 
+            # a portal end at the apex does not narrow an open funnel side
+            right_at_apex = right_pt == apex and right != apex
+            left_at_apex = left_pt == apex and left != apex
+
             # right funnel side
-            if triarea2(apex, right, right_pt) <= 0:
-                if apex == right or triarea2(apex, left, right_pt) > 0:
+            if not right_at_apex and triarea2(apex, right, right_pt) <= 0:
+                if (
+                    apex == right
+                    or triarea2(apex, left, right_pt) > 0
+                    or on_ray(apex, left, right_pt)
+                ):
                     right = right_pt
                     right_index = i
                 else:
@@ -97,8 +369,12 @@ class NavMesh(Mesh):
                     continue
 
             # left funnel side
-            if triarea2(apex, left, left_pt) >= 0:
-                if apex == left or triarea2(apex, right, left_pt) < 0:
+            if not left_at_apex and triarea2(apex, left, left_pt) >= 0:
+                if (
+                    apex == left
+                    or triarea2(apex, right, left_pt) < 0
+                    or on_ray(apex, right, left_pt)
+                ):
                     left = left_pt
                     left_index = i
                 else:
@@ -120,6 +396,19 @@ class NavMesh(Mesh):
         return path
 
 
+def same_room(e):
+    """Merge faces of one room only (faces without rooms: one room)"""
+    return getattr(e.face, "room", None) is getattr(e.twin.face, "room", None)
+
+
+def on_ray(apex, a, b):
+    """b on the segment apex -> a: the funnel is only narrowed to it"""
+    if triarea2(apex, a, b) != 0:
+        return False
+    d_a, d_b = a.xy - apex.xy, b.xy - apex.xy
+    return d_a @ d_b >= 0 and d_b @ d_b <= d_a @ d_a
+
+
 def triarea2(a, b, c):
     if isinstance(a, np.ndarray):
         return (b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])
@@ -0,0 +1,109 @@
+"""
+Convex regions of a navmesh, to shorten the funnel of a face corridor.
+The CDT and the door splits leave many thin triangles; merged into convex
+polygons (convex_regions, Hertel-Mehlhorn) a corridor crosses far fewer
+of them. A path crosses a convex region in a straight line, so the funnel
+only needs the portals between the regions of the corridor. The corridor
+itself comes from the face search: weights between region centroids (or
+portal midpoints) are too coarse for large regions and pick detours.
+"""
+
+import numpy as np
+
+from g_mesh import convex_regions
+
+EPS = 1e-9
+
+
+class RegionGraph:
+    """
+    faces: faces in fid order, labels: their region ids
+    portals: open half-edge from one region into another -> (left,
+             right) vertices of the straight open boundary around it, as
+             get_portals gives for two faces
+    """
+
+    def __init__(self, faces, can_merge=None):
+        self.faces, self.labels = convex_regions(faces, can_merge)
+        self.region_of = dict(zip(self.faces, self.labels.tolist()))
+        self.n = int(self.labels.max(initial=-1)) + 1
+
+        verts = list(dict.fromkeys(v for f in self.faces for v in f.verts))
+        vert_ids = {v: i for i, v in enumerate(verts)}
+        self.verts = verts
+        self.corner_verts = np.array(
+            [[vert_ids[v] for v in f.verts] for f in self.faces], dtype=int
+        ).reshape(-1, 3)
+
+        # open half-edges from one region into another
+        between = {}
+        for f in self.faces:
+            for e in f.edges:
+                if e.twin is None or e.is_blocked:
+                    continue
+                pair = (self.region_of[f], self.region_of.get(e.twin.face))
+                if pair[1] is not None and pair[0] != pair[1]:
+                    between.setdefault(pair, []).append(e)
+        self.portals = {}
+        for edges in between.values():
+            self.portals.update(self.__portals(edges))
+        self.update_geometry()
+
+    def __len__(self):
+        return self.n
+
+    @staticmethod
+    def __portals(edges):
+        """
+        Chains of consecutive edges on the (straight) boundary of two
+        convex regions, a blocked edge splits it into several: the ends
+        of the chain of every edge.
+        """
+        after = {e.ori: e for e in edges}
+        ends = {e.to for e in edges}
+        portals = {}
+        for e in edges:
+            if e.ori in ends:
+                continue  # not the first edge of a chain
+            chain = [e]
+            while chain[-1].to in after:
+                chain.append(after[chain[-1].to])
+            portals.update((c, (e.ori, chain[-1].to)) for c in chain)
+        return portals
+
+    def update_geometry(self):
+        """
+        Check the regions after vertices moved (same topology).
+        Returns False if a region is not convex anymore.
+        """
+        xy = np.array([v.xy for v in self.verts]).reshape(-1, 2)
+        corners = xy[self.corner_verts]
+        d_out = np.roll(corners, -1, axis=1) - corners
+        d_in = np.roll(corners, 1, axis=1) - corners
+        cross = d_out[..., 0] * d_in[..., 1] - d_out[..., 1] * d_in[..., 0]
+        dot = np.sum(d_out * d_in, axis=2)
+
+        # angle of every region at its vertices
+        key = self.labels[:, None] * len(xy) + self.corner_verts
+        total = np.bincount(key.ravel(), np.arctan2(cross, dot).ravel())
+        total = total[np.unique(key)]
+        return not np.any((total > np.pi + EPS) & (total < 2 * np.pi - EPS))
+
+    def find_portals(self, tripath):
+        """
+        Portals of the regions a face corridor crosses. A corridor back
+        into a region it left goes straight across that region instead,
+        so the funnel is never longer than over the faces.
+        """
+        regions, portals = [self.region_of[tripath[0]]], []
+        for f, f_next in zip(tripath, tripath[1:]):
+            region = self.region_of[f_next]
+            if region == regions[-1]:
+                continue
+            if region in regions:
+                i = regions.index(region)
+                del regions[i + 1 :], portals[i:]
+                continue
+            regions.append(region)
+            portals.append(self.portals[f.get_shared_edge(f_next)])
+        return portals
@@ -0,0 +1,392 @@
+"""
+Visibility graph of a navmesh, a path engine beside the face searches.
+Shortest paths between two points bend only at reflex corners of the
+walls (blocked and outer edges), and there are far fewer of those than
+faces. A corner is a vertex with its free sector, and a path bends at
+it only inside that sector, so it never slips between two thin walls
+meeting there. The graph links the corners that see each other and
+keeps their all-pairs shortest distances; a query links start and end
+to the corners they see. Sliding a door only moves its jamb vertices
+along the wall, and update() rechecks just the corner pairs that this
+can change.
+"""
+
+import numpy as np
+
+from g_primitives import Vertex
+from u_path_finding import dijkstra_indexed
+
+EPS = 1e-9  # orientation tolerance, coordinates are about 1
+CHUNK = 4096  # segments tested against all walls at once
+
+
+def orient(o, a, b):
+    """Twice the signed area of (o, a, b) with |area| <= EPS as 0"""
+    area = (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (
+        a[..., 1] - o[..., 1]
+    ) * (b[..., 0] - o[..., 0])
+    return np.where(np.abs(area) > EPS, np.sign(area), 0.0)
+
+
+def overlap(lo, hi, box_lo, box_hi):
+    """(len(lo), len(box_lo)): the boxes lo-hi and box_lo-box_hi meet"""
+    return (
+        (lo[:, None, 0] <= box_hi[:, 0])
+        & (lo[:, None, 1] <= box_hi[:, 1])
+        & (hi[:, None, 0] >= box_lo[:, 0])
+        & (hi[:, None, 1] >= box_lo[:, 1])
+    )
+
+
+class VisibilityGraph:
+    """
+    verts: vertices of the faces, xy: their positions
+    walls: (walls, 2) vertex ids of every wall, one half-edge per wall
+    sectors: each face corner at a wall vertex, labeled by the free sector
+             of the vertex it belongs to (corners joined by open edges)
+    corners: vertex ids of the reflex corners (a sector wider than pi)
+    corner_labels: that sector of each corner (at most one per vertex)
+    visible: (corners, corners) pairs linked by a tangent segment
+    weights, dist: (corners, corners) edge lengths and shortest distances
+    """
+
+    def __init__(self, faces):
+        self.faces = sorted(f for f in faces if f is not None and not f.flipped)
+        self.build()
+
+    def __len__(self):
+        return len(self.corners)
+
+    def build(self):
+        self.verts = list(dict.fromkeys(v for f in self.faces for v in f.verts))
+        self.vert_ids = {v: i for i, v in enumerate(self.verts)}
+
+        walls, seen = [], set()
+        for f in self.faces:
+            for e in f.edges:
+                if (e.twin is None or e.is_blocked) and e.twin not in seen:
+                    seen.add(e)
+                    walls.append([self.vert_ids[e.ori], self.vert_ids[e.to]])
+        self.walls = np.array(walls, dtype=int).reshape(-1, 2)
+        self.wall_verts = np.unique(self.walls)
+
+        # face corners at wall vertices, keyed by their outgoing half-edge
+        on_wall = set(self.wall_verts.tolist())
+        keys = [e for f in self.faces for e in f.edges]
+        keys = [e for e in keys if self.vert_ids[e.ori] in on_wall]
+        index = {e: k for k, e in enumerate(keys)}
+        label = list(range(len(keys)))
+
+        def find(k):
+            while label[k] != k:
+                label[k] = label[label[k]]
+                k = label[k]
+            return k
+
+        for k, e in enumerate(keys):
+            if e.twin is not None and not e.is_blocked:
+                label[find(k)] = find(index[e.twin.next])
+
+        self.sector_vert = np.array([self.vert_ids[e.ori] for e in keys], int)
+        self.sector_ends = np.array(
+            [[self.vert_ids[e.to], self.vert_ids[e.prev.ori]] for e in keys],
+            dtype=int,
+        ).reshape(-1, 2)
+        self.sector_label = np.array([find(k) for k in range(len(keys))])
+
+        # sectors of every vertex, padded to (verts, most sectors)
+        count = np.bincount(self.sector_vert, minlength=len(self.verts))
+        order = np.argsort(self.sector_vert, kind="stable")
+        slot = np.arange(len(order)) - np.repeat(
+            np.cumsum(count) - count, count
+        )
+        self.vert_sectors = np.full((len(self.verts), count.max(initial=0)), -1)
+        self.vert_sectors[self.sector_vert[order], slot] = order
+
+        self.update_geometry()
+        self.corner_labels = self.find_corners()
+        self.corners = self.sector_vert[self.corner_labels]
+        self.corner_ids = np.full(len(self.verts), -1)
+        self.corner_ids[self.corners] = np.arange(len(self.corners))
+
+        n = len(self.corners)
+        self.visible = np.zeros((n, n), dtype=bool)
+        self.check_pairs(*np.triu_indices(n, 1))
+        self.weights = self.get_weights()
+        self.shortest_paths()
+
+    def update_geometry(self):
+        """Positions and sector angles after vertices moved"""
+        self.xy = np.array([v.xy for v in self.verts]).reshape(-1, 2)
+        origin = self.xy[self.sector_vert]
+        d_out = self.xy[self.sector_ends[:, 0]] - origin
+        d_in = self.xy[self.sector_ends[:, 1]] - origin
+        self.sector_start = np.arctan2(d_out[:, 1], d_out[:, 0])
+        self.sector_span = np.mod(
+            np.arctan2(d_in[:, 1], d_in[:, 0]) - self.sector_start, 2 * np.pi
+        )
+
+    def find_corners(self):
+        """Labels of the reflex sectors, in vertex order"""
+        span = np.bincount(self.sector_label, self.sector_span)
+        reflex = np.flatnonzero(span > np.pi + EPS)
+        return reflex[np.argsort(self.sector_vert[reflex], kind="stable")]
+
+    # ----------------- Visibility -----------------
+    def check_pairs(self, i, j):
+        """
+        Whether the corner pairs (i, j) see each other along a segment
+        tangent at both corners: one that continues into free space past
+        each of them, leaving both inside the corner's sector. Only
+        those can be part of a shortest path.
+        """
+        a, b = self.corner_labels[i], self.corner_labels[j]
+        p, q = self.xy[self.corners[i]], self.xy[self.corners[j]]
+        ok = self.__in_label(a, p - q) & self.__in_label(b, q - p)
+        ok[ok] = self.in_sight(p[ok], q[ok], a[ok], b[ok])
+        self.visible[i, j] = self.visible[j, i] = ok
+
+    def in_sight(self, p, q, p_label=None, q_label=None):
+        """
+        Whether each segment p[i] -> q[i] stays in free space. p_label
+        and q_label are the sectors the ends leave a vertex from (-1 or
+        None: a free point, which must be inside the mesh). The segment
+        may run along walls and through wall vertices, all on one side:
+        that side must be the same sector before and after each of them.
+        """
+        p, q = np.asarray(p, dtype=float), np.asarray(q, dtype=float)
+        p_label = np.full(len(p), -1) if p_label is None else p_label
+        q_label = np.full(len(q), -1) if q_label is None else q_label
+        p_vert = np.where(p_label >= 0, self.sector_vert[p_label], -1)
+        q_vert = np.where(q_label >= 0, self.sector_vert[q_label], -1)
+
+        # sides (left, right) of the segment it may run on, at its ends
+        sides = np.ones((len(p), 2), dtype=bool)
+        for label, vert, d, at_end in [
+            (p_label, p_vert, q - p, False),
+            (q_label, q_vert, p - q, True),
+        ]:
+            at = np.flatnonzero(label >= 0)
+            turned = self.__turned(vert[at], d[at])
+            for side, labels in enumerate(turned[::-1] if at_end else turned):
+                sides[at, side] &= labels == label[at]
+
+        for lo in range(0, len(p), CHUNK):
+            rows = np.flatnonzero(sides[lo : lo + CHUNK].any(axis=1)) + lo
+            sides[rows] = self.__clear(
+                p[rows], q[rows], p_vert[rows], q_vert[rows], sides[rows]
+            )
+        return sides.any(axis=1)
+
+    def __clear(self, p, q, p_vert, q_vert, sides):
+        """Sides free of crossed walls and of wall vertices between sectors"""
+        lo, hi = np.minimum(p, q) - EPS, np.maximum(p, q) + EPS
+        ok = np.ones(len(p), dtype=bool)
+
+        # walls crossed, among those whose bounding box meets the segment's
+        a, b = self.xy[self.walls[:, 0]], self.xy[self.walls[:, 1]]
+        s, w = np.nonzero(overlap(lo, hi, np.minimum(a, b), np.maximum(a, b)))
+        a, b, ps, qs = a[w], b[w], p[s], q[s]
+        crossed = (orient(ps, qs, a) * orient(ps, qs, b) < 0) & (
+            orient(a, b, ps) * orient(a, b, qs) < 0
+        )
+        ok[s[crossed]] = False
+
+        # wall vertices on the segment, whose sides must be one sector
+        xy = self.xy[self.wall_verts]
+        s, k = np.nonzero(overlap(lo, hi, xy, xy))
+        v = self.wall_verts[k]
+        on = ok[s] & (v != p_vert[s]) & (v != q_vert[s])
+        on[on] = orient(p[s[on]], q[s[on]], self.xy[v[on]]) == 0
+        s, v = s[on], v[on]
+
+        d = q[s] - p[s]
+        # the left side is counterclockwise of d, clockwise of -d
+        (ahead_ccw, ahead_cw), (back_ccw, back_cw) = (
+            self.__turned(v, d),
+            self.__turned(v, -d),
+        )
+        sides = sides & ok[:, None]
+        sides[s[(ahead_ccw != back_cw) | (ahead_ccw < 0)], 0] = False
+        sides[s[(ahead_cw != back_ccw) | (ahead_cw < 0)], 1] = False
+        return sides
+
+    def __turned(self, verts, d):
+        """
+        Sector labels at verts just counterclockwise (left) and clockwise
+        (right) of direction d (-1: outside the mesh). Along a wall the
+        two differ, elsewhere both are the sector d points into.
+        """
+        sectors = self.vert_sectors[verts]
+        angle = np.arctan2(d[:, 1], d[:, 0])[:, None]
+        rel = np.mod(angle - self.sector_start[sectors], 2 * np.pi)
+        rel = np.where(rel >= 2 * np.pi - EPS, 0.0, rel)
+        span = self.sector_span[sectors]
+        labels = self.sector_label[sectors]
+        rows = np.arange(len(sectors))
+
+        turned = []
+        for inside in [rel < span - EPS, (rel > EPS) & (rel <= span + EPS)]:
+            inside &= sectors >= 0
+            k = np.argmax(inside, axis=1)
+            turned.append(np.where(inside[rows, k], labels[rows, k], -1))
+        return turned
+
+    def __in_label(self, labels, d):
+        """Direction d in the closed sector labels of their vertices"""
+        verts = self.sector_vert[labels]
+        same = self.sector_label[self.vert_sectors[verts]] == labels[:, None]
+        return (self.__in_sector(verts, d) & same).any(axis=1)
+
+    def __in_sector(self, verts, d):
+        """(len(verts), most sectors): direction d in the closed sector"""
+        sectors = self.vert_sectors[verts]
+        angle = np.arctan2(d[:, 1], d[:, 0])[:, None]
+        rel = np.mod(angle - self.sector_start[sectors], 2 * np.pi)
+        span = self.sector_span[sectors]
+        inside = (rel <= span + EPS) | (rel >= 2 * np.pi - EPS)
+        return inside & (sectors >= 0)
+
+    # ----------------- Distances -----------------
+    def get_weights(self):
+        """(corners, corners) length of the visible pairs, inf otherwise"""
+        xy = self.xy[self.corners]
+        length = np.linalg.norm(xy[:, None] - xy[None], axis=2)
+        return np.where(self.visible, length, np.inf)
+
+    def shortest_paths(self):
+        """All pairs (Floyd-Warshall)"""
+        dist = self.weights.copy()
+        np.fill_diagonal(dist, 0.0)
+        for k in range(len(dist)):
+            dist = np.minimum(dist, dist[:, k, None] + dist[None, k, :])
+        self.dist = dist
+
+    def update_distances(self, old_weights):
+        """
+        All pairs after some weights changed, without Floyd-Warshall:
+        the rows with a shortest path over an edge that got longer are
+        searched again, then the edges that got shorter are relaxed.
+        """
+        dist = self.dist
+        i, j = np.nonzero(np.triu(self.weights != old_weights, 1))
+        longer = self.weights[i, j] > old_weights[i, j]
+
+        u, v = i[longer], j[longer]
+        w = old_weights[u, v]
+        d_u, d_v = dist[:, u], dist[:, v]
+        tight = np.isfinite(d_u) & np.isfinite(d_v)
+        tight &= np.isclose(d_u + w, d_v) | np.isclose(d_v + w, d_u)
+        rows = np.flatnonzero(tight.any(axis=1))
+        if len(rows):
+            # searched with the shorter edges at their old weight
+            adjacency = self.__adjacency(np.maximum(self.weights, old_weights))
+            dist[rows] = [dijkstra_indexed(adjacency, r) for r in rows]
+            dist[:, rows] = dist[rows].T
+
+        for u, v in zip(i[~longer], j[~longer]):
+            w = self.weights[u, v]
+            via = np.minimum(
+                dist[:, u, None] + w + dist[None, v, :],
+                dist[:, v, None] + w + dist[None, u, :],
+            )
+            np.minimum(dist, via, out=dist)
+
+    @staticmethod
+    def __adjacency(weights):
+        """Finite weights in the CSR lists of u_path_finding"""
+        rows, cols = np.nonzero(np.isfinite(weights))
+        indptr = np.searchsorted(rows, np.arange(len(weights) + 1))
+        return (
+            indptr.tolist(),
+            cols.tolist(),
+            [False] * len(cols),
+            weights[rows, cols].tolist(),
+        )
+
+    # ----------------- Updates -----------------
+    def update(self, verts):
+        """
+        Recheck after verts slid along their walls (same topology): the
+        pairs of corners next to them and the pairs whose segment meets
+        a wall that moved. A new set of corners rebuilds the graph.
+        """
+        moved = [self.vert_ids.get(v) for v in verts]
+        if None in moved:
+            return self.build()
+        moved = np.array(moved, dtype=int)
+
+        changed = np.isin(self.walls, moved).any(axis=1)
+        old = self.xy[self.walls[changed]]
+        self.update_geometry()
+        if not np.array_equal(self.find_corners(), self.corner_labels):
+            return self.build()
+        new = self.xy[self.walls[changed]]
+
+        # corners whose sectors changed: at or next to a moved vertex
+        near = np.isin(self.sector_ends, moved).any(axis=1)
+        near = np.union1d(self.sector_vert[near], moved)
+        near = self.corner_ids[near]
+        near = near[near >= 0]
+
+        n = len(self.corners)
+        i, j = np.triu_indices(n, 1)
+        recheck = np.isin(i, near) | np.isin(j, near)
+        p, q = self.xy[self.corners[i]], self.xy[self.corners[j]]
+        for a, b in zip(*np.concatenate([old, new]).transpose(1, 0, 2)):
+            recheck |= (orient(p, q, a) * orient(p, q, b) <= 0) & (
+                orient(a, b, p) * orient(a, b, q) <= 0
+            )
+        self.check_pairs(i[recheck], j[recheck])
+
+        old_weights, self.weights = self.weights, self.get_weights()
+        self.update_distances(old_weights)
+
+    # ----------------- Queries -----------------
+    def find_path(self, start, end):
+        """
+        Shortest path [start, corner vertices..., end] between two points
+        inside the mesh, None if end cannot be reached.
+        """
+        s, e = self.__as_xy(start), self.__as_xy(end)
+        if self.in_sight(s[None], e[None])[0]:
+            return [start, end]
+
+        if len(self.corners) == 0:  # no corner to go around
+            return None
+
+        to_start, to_end = self.__to_corners(s), self.__to_corners(e)
+        total = to_start[:, None] + self.dist + to_end[None, :]
+        i, j = np.unravel_index(np.argmin(total), total.shape)
+        if not np.isfinite(total[i, j]):
+            return None
+
+        path = [start, self.verts[self.corners[i]]]
+        while i != j:  # the next corner on a shortest path to j
+            i = np.argmin(self.weights[i] + self.dist[:, j])
+            path.append(self.verts[self.corners[i]])
+        return path + [end]
+
+    def path_length(self, start, end):
+        """Length of the shortest path, inf if end cannot be reached"""
+        s, e = self.__as_xy(start), self.__as_xy(end)
+        if self.in_sight(s[None], e[None])[0]:
+            return float(np.linalg.norm(e - s))
+        to_start, to_end = self.__to_corners(s), self.__to_corners(e)
+        via = np.min(to_start[:, None] + self.dist, axis=0, initial=np.inf)
+        return float(np.min(via + to_end, initial=np.inf))
+
+    def __to_corners(self, xy):
+        """Distance from a free point to the corners it sees (tangent)"""
+        corner_xy = self.xy[self.corners]
+        ok = self.__in_label(self.corner_labels, corner_xy - xy)
+        p = np.broadcast_to(xy, corner_xy.shape)
+        ok[ok] = self.in_sight(
+            p[ok], corner_xy[ok], q_label=self.corner_labels[ok]
+        )
+        length = np.linalg.norm(corner_xy - xy, axis=1)
+        return np.where(ok, length, np.inf)
+
+    @staticmethod
+    def __as_xy(point):
+        return np.asarray(point.xy if isinstance(point, Vertex) else point)
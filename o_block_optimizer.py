@@ -0,0 +1,232 @@
+import numpy as np
+
+from o_optimizer import MHOptimizer
+import u_parallel
+
+
+def partition_doors(ecs, hops=1):
+    """
+    Partition the optimizable doors into groups of interacting doors.
+    Two doors interact if their rooms are at most `hops` apart on the room
+    graph without the rooms they share, so doors that only share a hall
+    are apart unless their other rooms are close. Doors between the same
+    rooms always interact.
+    Returns a list of store rows per group.
+    """
+    store = ecs.store
+    rows = [int(r) for r in np.flatnonzero(store.need_optimization[: store.n])]
+    parent = {r: r for r in rows}  # union-find over rows
+
+    def find(r):
+        while parent[r] != r:
+            parent[r] = parent[parent[r]]
+            r = parent[r]
+        return r
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        parent[max(ra, rb)] = min(ra, rb)
+
+    for i, a in enumerate(rows):
+        for b in rows[i + 1 :]:
+            if doors_interact(store.comps[a], store.comps[b], hops):
+                union(a, b)
+
+    groups = {}
+    for r in rows:
+        groups.setdefault(find(r), []).append(r)
+    return [groups[k] for k in sorted(groups)]
+
+
+def doors_interact(door_a, door_b, hops):
+    rooms_a = set(room for room in door_a.rooms if room is not None)
+    rooms_b = set(room for room in door_b.rooms if room is not None)
+    shared = rooms_a & rooms_b
+    if not rooms_a - shared or not rooms_b - shared:
+        return True
+
+    # rooms within hops of door_a, around the shared rooms
+    near = rooms_a - shared
+    frontier = set(near)
+    for _ in range(hops):
+        frontier = set(a for room in frontier for a in room.adjs)
+        frontier -= near | shared
+        near |= frontier
+    return not near.isdisjoint(rooms_b)
+
+
+def group_rooms(ecs, rows):
+    return set(
+        room
+        for r in rows
+        for room in ecs.store.comps[r].rooms
+        if room is not None
+    )
+
+
+def local_samples(layout, samples, rooms):
+    """
+    Sample points inside the rooms, in order; consecutive points are pairs
+    as in the full sample. All samples if fewer than one pair is left.
+    """
+    faces = layout.locate_points(samples)
+    local = [
+        p
+        for p, face in zip(samples, faces)
+        if face is not None and face.room in rooms
+    ]
+    return local if len(local) > 1 else samples
+
+
+class GroupSystem:
+    """DoorSystem view that only proposes moves for a group of doors"""
+
+    def __init__(self, system, rows):
+        self.system = system
+        self.rows = rows
+
+    def propose(self, sigma=0.1):
+        self.system.propose(sigma=sigma, rows=self.rows)
+
+    def reject(self):
+        self.system.reject(rows=self.rows)
+
+    def get_states(self):
+        return self.system.get_states()
+
+    def load_manually(self, edges, ratios):
+        self.system.load_manually(edges, ratios)
+
+
+class BlockOptimizer:
+    """
+    Metropolis-Hastings over groups of interacting doors.
+    Each group is optimized with the other doors frozen and scored with
+    its local objective: f on the sample points inside the rooms of its
+    doors. Groups run in worker processes when a builder is given, else
+    one after another; either way all of them start from the door states
+    of the layout when run() is called, and their best states are merged
+    into the main layout, which is scored with the full f.
+    """
+
+    def __init__(
+        self,
+        layout,
+        system,
+        f,
+        T,
+        samples,
+        groups=None,
+        builder=None,
+        builder_args=(),
+        workers=None,
+    ):
+        self.layout = layout
+        self.system = system
+        self.f = f
+        self.T = T
+        self.samples = samples
+
+        self.groups = groups or partition_doors(system.ecs)
+        self.builder = builder
+        self.builder_args = builder_args
+        self.workers = workers
+
+        # for logging
+        self.group_scores = []
+        self.best_score = None
+
+    def run(self, num_steps, sigma=0.1, seed=0):
+        base = u_parallel.to_eid_states(*self.system.get_states())
+        if self.builder is None or self.workers == 1 or len(self.groups) == 1:
+            results = [
+                self.__optimize_here(rows, base, num_steps, sigma, seed + i)
+                for i, rows in enumerate(self.groups)
+            ]
+        else:
+            with u_parallel.create_pool(
+                self.workers, self.builder, self.builder_args
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _optimize_group,
+                        rows,
+                        base,
+                        num_steps,
+                        sigma,
+                        self.T,
+                        seed + i,
+                    )
+                    for i, rows in enumerate(self.groups)
+                ]
+                results = [future.result() for future in futures]
+
+        self.__merge(results)
+        return self.best_score
+
+    def __optimize_here(self, rows, base, num_steps, sigma, seed):
+        u_parallel.load_eid_states(self.layout, self.system, *base)
+        np.random.seed(seed)
+        rooms = group_rooms(self.system.ecs, rows)
+        mh = MHOptimizer(
+            self.layout,
+            GroupSystem(self.system, rows),
+            self.f,
+            self.T,
+            local_samples(self.layout, self.samples, rooms),
+        )
+        return _run_mh(mh, rows, num_steps, sigma)
+
+    def __merge(self, results):
+        self.group_scores = []
+        for rows, eids, ratios, score in results:
+            u_parallel.load_eid_states(
+                self.layout, self.system, eids, ratios, rows=rows
+            )
+            self.group_scores.append(score)
+        self.best_score = self.f(self.layout, self.samples)
+
+
+def _run_mh(mh, rows, num_steps, sigma):
+    """Run MH on a group; returns (rows, eids, ratios, best local score)"""
+    mh.init()
+    for _ in range(num_steps):
+        mh.step(sigma=sigma)
+    mh.end()
+    eids, ratios = u_parallel.to_eid_states(*mh.system.get_states())
+    return rows, eids, ratios, mh.best_score
+
+
+def _optimize_group(rows, base, num_steps, sigma, T, seed):
+    """Worker task: optimize one group from the base door states"""
+    layout, system, f, samples = u_parallel.get_context()
+    u_parallel.load_eid_states(layout, system, *base)
+
+    np.random.seed(seed)
+    samples = local_samples(layout, samples, group_rooms(system.ecs, rows))
+    mh = MHOptimizer(layout, GroupSystem(system, rows), f, T, samples)
+    return _run_mh(mh, rows, num_steps, sigma)
+
+
+if __name__ == "__main__":
+    import e_multi_optimize
+    from u_loader import ULoader
+
+    case_id = 2
+    config = ULoader.load_config().get_config(case_id)
+    fp, door_system, f, sample_points = e_multi_optimize.build_case(case_id)
+
+    groups = partition_doors(door_system.ecs)
+    print(f"Door groups: {groups}")
+
+    opt = BlockOptimizer(
+        fp,
+        door_system,
+        f,
+        config.temperature,
+        sample_points,
+        groups=groups,
+        builder=e_multi_optimize.build_case,
+        builder_args=(case_id,),
+    )
+    print(f"Best score: {opt.run(config.iterations, sigma=config.sigma):.3f}")
@@ -8,22 +8,55 @@ def loss_func(path):
 
 
 def traffic_loss_func(path):
-    return sum(
-        np.linalg.norm(path[i].xy - path[i + 1].xy)
-        for i in range(len(path) - 1)
-    )
+    return path_length(to_xy(path))
 
 
 def entrance_loss_func(doors, target_dist=0.1):
-    """Every door to the entrances"""
-    loss = 0
-    for d in doors:
-        for dd in doors:
-            if d == dd:
-                continue
-            dist = np.linalg.norm(d.xy - dd.xy)
-
-            if dist < target_dist:
-                loss += (target_dist - dist) ** 2
-
-    return loss
+    """Every door to the entrances: each pair closer than target_dist"""
+    return door_spacing_loss(to_xy(doors), target_dist)
+
+
+# ----------------- Array versions -----------------
+def to_xy(points):
+    """Points (or an array) as an (N, 2) array"""
+    if isinstance(points, np.ndarray):
+        return points[:, :2]
+    return np.array([p.xy for p in points]).reshape(-1, 2)
+
+
+def path_length(xy):
+    """Length of a (N, 2) polyline"""
+    d = np.diff(xy, axis=0)
+    return np.sum(np.hypot(d[:, 0], d[:, 1]))
+
+
+def pad_paths(paths):
+    """
+    Paths of different lengths as one (B, L, 2) batch.
+    Short paths repeat their last point, which adds zero length.
+    """
+    xys = [to_xy(p) for p in paths]
+    batch = np.zeros((len(xys), max(map(len, xys), default=0), 2))
+    for i, xy in enumerate(xys):
+        batch[i, : len(xy)] = xy
+        batch[i, len(xy) :] = xy[-1]
+    return batch
+
+
+def path_lengths(batch):
+    """Lengths of a (B, L, 2) batch of paths"""
+    d = np.diff(batch, axis=1)
+    return np.sum(np.hypot(d[..., 0], d[..., 1]), axis=1)
+
+
+def pairwise_distances(xy):
+    """(N, N) distances between the rows of a (N, 2) array"""
+    d = xy[:, None, :] - xy[None, :, :]
+    return np.hypot(d[..., 0], d[..., 1])
+
+
+def door_spacing_loss(xy, target_dist=0.1):
+    """Squared shortfall of every door pair closer than target_dist"""
+    i, j = np.triu_indices(len(xy), k=1)  # each pair once
+    dist = pairwise_distances(xy)[i, j]
+    return np.sum(np.maximum(target_dist - dist, 0) ** 2)
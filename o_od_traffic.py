@@ -0,0 +1,115 @@
+"""
+Traffic loss on the room/door graph instead of per-sample paths.
+Sample points are aggregated per room once: the pairs of consecutive
+samples become room-to-room demand, and each room keeps the mean and the
+spread of its points. A step then only needs the door centers: walking
+costs inside rooms are straight lines, and the cost between rooms is an
+all-pairs shortest path over the doors. Evaluation is
+O(rooms * doors^2) and does not depend on the sample size.
+"""
+
+import numpy as np
+
+from g_primitives import Vertex
+
+
+class ODTrafficLoss:
+    """
+    Drop-in for traffic_loss(fp, sample_points).
+    Approximations: a point reaches a door of its room in a straight line,
+    with the root mean square distance of the room's points, and doors of
+    one room are connected in a straight line.
+    """
+
+    def __init__(self, system):
+        self.system = system
+        self.samples = None  # sample points the demand was built from
+
+        self.n_samples = 0
+        self.same_room_cost = 0.0  # pairs inside one room
+        self.demand = None  # (rooms, rooms) pair counts
+        self.mean = None  # (rooms, 2) mean point of every room
+        self.var = None  # (rooms,) mean squared distance to the mean
+
+    def __call__(self, layout, sample_points):
+        if self.samples is not sample_points:
+            self.prepare(layout, sample_points)
+
+        costs = self.room_costs(layout)
+        # unreachable rooms add nothing, as paths not found in traffic_loss
+        used = (self.demand > 0) & np.isfinite(costs)
+        cross = np.sum(costs[used] * self.demand[used])
+        return (self.same_room_cost + cross) / (self.n_samples / 2)
+
+    def prepare(self, layout, sample_points):
+        """Aggregate the sample points into per-room demand and moments"""
+        n_rooms = len(layout.rooms)
+        faces = layout.locate_points(sample_points)
+        rids = np.array([-1 if f is None else f.room.rid for f in faces])
+        xy = np.array(
+            [p.xy if isinstance(p, Vertex) else p for p in sample_points]
+        )
+
+        self.samples = sample_points
+        self.n_samples = len(sample_points)
+
+        a, b = rids[:-1], rids[1:]
+        valid = (a >= 0) & (b >= 0)
+        same = valid & (a == b)
+        steps = np.linalg.norm(xy[1:] - xy[:-1], axis=1)
+        self.same_room_cost = float(np.sum(steps[same]))
+
+        self.demand = np.zeros((n_rooms, n_rooms))
+        cross = valid & (a != b)
+        np.add.at(self.demand, (a[cross], b[cross]), 1)
+
+        self.mean = np.zeros((n_rooms, 2))
+        self.var = np.zeros(n_rooms)
+        for rid in range(n_rooms):
+            points = xy[rids == rid]
+            if len(points):
+                self.mean[rid] = points.mean(axis=0)
+                self.var[rid] = np.mean(
+                    np.sum((points - self.mean[rid]) ** 2, 1)
+                )
+
+    def room_costs(self, layout):
+        """(rooms, rooms) travel cost between the points of two rooms"""
+        n_rooms = len(layout.rooms)
+        centers, door_rooms = self.__door_graph()
+        n_doors = len(centers)
+        if n_doors == 0:
+            return np.full((n_rooms, n_rooms), np.inf)
+
+        # room -> door: rms distance of the room's points to the door
+        to_door = np.full((n_rooms, n_doors), np.inf)
+        for d, rooms in enumerate(door_rooms):
+            for r in rooms:
+                diff = self.mean[r] - centers[d]
+                to_door[r, d] = np.sqrt(diff @ diff + self.var[r])
+
+        # door -> door: straight inside a shared room, then shortest paths
+        dist = np.linalg.norm(centers[:, None] - centers[None], axis=2)
+        shared = door_rooms[:, None, :, None] == door_rooms[None, :, None, :]
+        graph = np.where(shared.any(axis=(2, 3)), dist, np.inf)
+        np.fill_diagonal(graph, 0.0)
+        for k in range(n_doors):  # Floyd-Warshall
+            graph = np.minimum(graph, graph[:, k, None] + graph[None, k, :])
+
+        # room -> any door -> room (min-plus products)
+        via = np.min(to_door[:, :, None] + graph[None], axis=1)
+        return np.min(via[:, None, :] + to_door[None, :, :], axis=2)
+
+    def __door_graph(self):
+        """Centers and rooms (rids) of the doors between two rooms"""
+        store = self.system.ecs.store
+        centers, door_rooms = [], []
+        for row in range(store.n):
+            door_comp = store.comps[row]
+            rooms = store.room_ids[row]
+            if not door_comp.is_active or (rooms < 0).any():
+                continue
+            centers.append(self.system.ratio_to_xy(door_comp, door_comp.ratio))
+            door_rooms.append(rooms)
+        centers = np.array(centers).reshape(-1, 2)
+        return centers, np.array(door_rooms).reshape(-1, 2)
@@ -1,6 +1,8 @@
 import numpy as np
 from tqdm import tqdm
 
+import u_parallel
+
 
 # Metropolis-Hastings Optimizer
 class MHOptimizer:
@@ -30,7 +32,7 @@ class MHOptimizer:
 
         self.has_started = True
         self.prev_score = self.f(self.layout, self.samples)
-        self.__update_bests(self.prev_score)
+        self._update_bests(self.prev_score)
         # fig = vis.get_fig()
 
     def step(self, sigma=0.1):
@@ -45,7 +47,7 @@ class MHOptimizer:
             self.prev_score = new_score
             self.losses.append(new_score)
             if new_score < self.best_score:
-                self.__update_bests(new_score)
+                self._update_bests(new_score)
         else:
             self.system.reject()
 
@@ -67,6 +69,233 @@ class MHOptimizer:
 
         self.end()
 
-    def __update_bests(self, score):
+    def _update_bests(self, score):
         self.best_edge, self.best_ratio = self.system.get_states()
         self.best_score = score
+
+
+# Metropolis-Hastings with single-door (coordinate) proposals
+class GibbsMHOptimizer(MHOptimizer):
+    """
+    Proposes one door at a time and only rescores the sample pairs whose
+    cached path touches one of that door's two rooms; moving the door
+    retriangulates both rooms, so any of those paths can change. A pair
+    is missed only if its new path goes through the moved door while its
+    old one touched neither room. Every `refresh_every` steps all pairs
+    are rescored to bound the drift from such pairs.
+    The objective is split into pair costs and an optional global term:
+        pair_f(layout, start, end) -> (cost, tripath)
+        global_f(layout) -> cost
+        f = pair_weight * sum(pair costs) + global_f
+    Pairs are consecutive sample points.
+    """
+
+    def __init__(
+        self,
+        layout,
+        system,
+        pair_f,
+        T,
+        samples,
+        global_f=None,
+        pair_weight=None,
+        refresh_every=50,
+    ):
+        super().__init__(layout, system, self.evaluate, T, samples)
+        self.pair_f = pair_f
+        self.global_f = global_f
+        self.pair_weight = (
+            pair_weight if pair_weight is not None else 2 / len(samples)
+        )
+
+        self.n_pairs = len(samples) - 1
+        self.pair_costs = np.zeros(self.n_pairs)
+        self.pair_rooms = [set() for _ in range(self.n_pairs)]
+        self.no_path = set()  # pairs without a path
+        self.global_score = 0.0
+        self.cursor = 0  # systematic scan over doors
+        self.refresh_every = refresh_every
+
+        # for logging
+        self.n_pair_evals = 0
+        self.n_accepted = 0
+
+    def evaluate(self, layout, samples):
+        """Full objective; refreshes the pair cache"""
+        self.__score_pairs(np.arange(self.n_pairs))
+        self.global_score = self.global_f(layout) if self.global_f else 0.0
+        return self.pair_weight * self.pair_costs.sum() + self.global_score
+
+    def step(self, sigma=0.1):
+        store = self.system.ecs.store
+        rows = store.movable_rows()
+        if len(rows) == 0:
+            return
+        row = rows[self.cursor % len(rows)]
+        self.cursor += 1
+        rooms = set(store.comps[row].rooms)
+
+        self.system.propose(sigma=sigma, rows=[row])
+
+        # only the pairs whose path touches the rooms of the door
+        idx = np.array(
+            [
+                i
+                for i, rs in enumerate(self.pair_rooms)
+                if rs & rooms
+            ],
+            dtype=int,
+        )
+        old_costs = self.pair_costs[idx]
+        old_rooms = [self.pair_rooms[i] for i in idx]
+        old_no_path = self.no_path.copy()
+        self.__score_pairs(idx)
+        new_global = self.global_f(self.layout) if self.global_f else 0.0
+
+        df = self.pair_weight * (self.pair_costs[idx].sum() - old_costs.sum())
+        df += new_global - self.global_score
+
+        # Accept or reject proposal
+        alpha = np.exp(-df / self.T)
+        if np.random.rand() < alpha:
+            self.n_accepted += 1
+            self.global_score = new_global
+            self.prev_score += df
+            self.losses.append(self.prev_score)
+            if self.prev_score < self.best_score:
+                self._update_bests(self.prev_score)
+        else:
+            self.system.reject(rows=[row])
+            self.pair_costs[idx] = old_costs
+            for i, rs in zip(idx, old_rooms):
+                self.pair_rooms[i] = rs
+            self.no_path = old_no_path
+
+        self.T *= 0.99
+        if self.refresh_every and self.cursor % self.refresh_every == 0:
+            self.prev_score = self.evaluate(self.layout, self.samples)
+
+    def __score_pairs(self, idx):
+        for i in idx:
+            start, end = self.samples[i], self.samples[i + 1]
+            cost, tripath = self.pair_f(self.layout, start, end)
+            if tripath is None:  # endpoints only
+                self.no_path.add(i)
+                tripath = [
+                    self.layout.get_point_inside_face(start),
+                    self.layout.get_point_inside_face(end),
+                ]
+            else:
+                self.no_path.discard(i)
+            self.pair_costs[i] = cost
+            self.pair_rooms[i] = set(f.room for f in tripath)
+            self.pair_rooms[i].discard(None)
+        self.n_pair_evals += len(idx)
+
+
+# Multiple-try Metropolis
+class MTMOptimizer(MHOptimizer):
+    """
+    Draws k proposals from the current door states per step and scores them
+    on worker processes, each against its own copy of the layout, or one by
+    one on this layout without a builder (see u_parallel).
+    One proposal y is picked with weights w = exp(-f / T); it is accepted
+    with probability min(1, sum w(y_j) / sum w(x_j)), where x_j are k - 1
+    proposals drawn from y plus the current state.
+    """
+
+    def __init__(
+        self,
+        layout,
+        system,
+        f,
+        T,
+        samples,
+        k=4,
+        builder=None,
+        builder_args=(),
+        workers=None,
+    ):
+        super().__init__(layout, system, f, T, samples)
+        self.k = k
+        self.builder = builder
+        self.builder_args = builder_args
+        self.workers = workers
+        self.pool = None
+
+        # for logging
+        self.n_evals = 0
+
+    def init(self):
+        if self.builder is not None and self.pool is None:
+            self.pool = u_parallel.create_pool(
+                self.workers, self.builder, self.builder_args
+            )
+        super().init()
+
+    def end(self):
+        super().end()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def step(self, sigma=0.1):
+        x = self.__snapshot()
+        ys = self.__draw(sigma, self.k)
+        fy = self.__scores(ys)
+
+        # select one proposal
+        wy = np.exp(-(fy - fy.min()) / self.T)
+        j = np.random.choice(self.k, p=wy / wy.sum())
+
+        # reference set around the selected proposal
+        self.__load(ys[j])
+        xs = self.__draw(sigma, self.k - 1)
+        fx = np.append(self.__scores(xs), self.prev_score)
+
+        # Accept or reject proposal
+        log_alpha = _log_sum_exp(-fy / self.T) - _log_sum_exp(-fx / self.T)
+        if np.log(np.random.rand()) < log_alpha:
+            self.__load(ys[j])
+            self.prev_score = fy[j]
+            self.losses.append(fy[j])
+            if fy[j] < self.best_score:
+                self._update_bests(fy[j])
+        else:
+            self.__load(x)
+
+        self.T *= 0.99
+
+    def __snapshot(self):
+        return u_parallel.to_eid_states(*self.system.get_states())
+
+    def __load(self, state):
+        u_parallel.load_eid_states(self.layout, self.system, *state)
+
+    def __draw(self, sigma, n):
+        """n proposals from the current states, which are kept"""
+        states = []
+        for _ in range(n):
+            self.system.propose(sigma=sigma)
+            states.append(self.__snapshot())
+            self.system.reject()
+        return states
+
+    def __scores(self, states):
+        self.n_evals += len(states)
+        if self.pool is not None:
+            futures = [
+                self.pool.submit(u_parallel.evaluate_states, *s) for s in states
+            ]
+            return np.array([future.result() for future in futures])
+
+        scores = []
+        for s in states:
+            self.__load(s)
+            scores.append(self.f(self.layout, self.samples))
+        return np.array(scores)
+
+
+def _log_sum_exp(a):
+    m = np.max(a)
+    return m + np.log(np.sum(np.exp(a - m)))
@@ -0,0 +1,169 @@
+"""
+Exhaustive 1-D loss landscape of every door along its shared walls.
+Each door is moved over a grid of positions along the wall it shares with
+its other room while the other doors stay at their current states.
+"""
+
+import numpy as np
+
+import u_parallel
+
+SWEEP_DTYPE = np.dtype(
+    [
+        ("door", np.int16),  # store row of the door
+        ("eid", np.int32),  # bound edge
+        ("ratio", np.float32),
+        ("s", np.float32),  # arc length along the wall chain
+        ("x", np.float32),  # door center
+        ("y", np.float32),
+        ("loss", np.float32),
+    ]
+)
+
+
+def wall_chain(door_comp):
+    """Shared wall edges of a door, one half-edge per segment, in order"""
+    segs = []
+    for e in door_comp.shared_edges:
+        if e not in segs and e.twin not in segs:
+            segs.append(e)
+
+    def touches(v, seg):
+        return any(s is not seg and (v is s.ori or v is s.to) for s in segs)
+
+    chain = []
+    while segs:
+        # start from a free end of the wall if there is one
+        e = segs[0]
+        for s in segs:
+            if not touches(s.ori, s) or not touches(s.to, s):
+                e = s if not touches(s.ori, s) else s.twin
+                break
+        segs.remove(e if e in segs else e.twin)
+        chain.append(e)
+
+        while True:
+            v = chain[-1].to
+            nxt = next((s for s in segs if s.ori is v or s.to is v), None)
+            if nxt is None:
+                break
+            segs.remove(nxt)
+            chain.append(nxt if nxt.ori is v else nxt.twin)
+    return chain
+
+
+def door_positions(system, door_comp, resolution=0.02):
+    """
+    Discretize the wall chain of a door.
+    Returns [(edge, ratio, s, center), ...] with s the arc length along
+    the chain and center the door center position.
+    """
+    # edge lengths without the door itself cut into them
+    was_active = door_comp.is_active
+    system.deactivate(door_comp)
+
+    positions, s0 = [], 0.0
+    for e in wall_chain(door_comp):
+        length = e.get_length()
+        lo = door_comp.d_len / 2 / length
+        n = int(np.floor((1 - 2 * lo) * length / resolution)) + 1
+        ratios = np.linspace(lo, 1 - lo, n) if n > 1 else [0.5]
+        positions += [
+            (e, r, s0 + r * length, e.ori.xy + e.get_dir() * r * length)
+            for r in ratios
+        ]
+        s0 += length
+
+    if was_active:
+        system.activate(door_comp)
+    return positions
+
+
+def sweep_doors(
+    layout,
+    system,
+    f,
+    samples,
+    resolution=0.02,
+    rows=None,
+    builder=None,
+    builder_args=(),
+    workers=None,
+    chunk_size=16,
+):
+    """
+    Loss at every position of every door (or of the doors in store rows).
+    Positions are scored on worker processes when a builder is given,
+    each worker with its own copy of the layout (see u_parallel).
+    The layout is left in its current door states.
+    """
+    store = system.ecs.store
+    rows = store.movable_rows() if rows is None else rows
+    base = u_parallel.to_eid_states(*system.get_states())
+
+    sweep, tasks = [], []
+    for row in rows:
+        positions = door_positions(system, store.comps[row], resolution)
+        sweep += [(row, e.eid, r, s, *xy, np.nan) for e, r, s, xy in positions]
+        tasks.append((row, [(e.eid, r) for e, r, _, _ in positions]))
+    sweep = np.array(sweep, dtype=SWEEP_DTYPE)
+
+    chunks = [
+        (row, positions[i : i + chunk_size])
+        for row, positions in tasks
+        for i in range(0, len(positions), chunk_size)
+    ]
+    if builder is None:
+        context = (layout, system, f, samples)
+        losses = [
+            _evaluate_positions(row, p, base, context) for row, p in chunks
+        ]
+        u_parallel.load_eid_states(layout, system, *base)
+    else:
+        with u_parallel.create_pool(workers, builder, builder_args) as pool:
+            futures = [
+                pool.submit(_evaluate_positions, row, p, base)
+                for row, p in chunks
+            ]
+            losses = [future.result() for future in futures]
+
+    sweep["loss"] = np.concatenate(losses)
+    return sweep
+
+
+def _evaluate_positions(row, positions, base, context=None):
+    """Loss of one door at (eid, ratio) positions, others at base states"""
+    layout, system, f, samples = context or u_parallel.get_context()
+    u_parallel.load_eid_states(layout, system, *base)
+
+    door_comp = system.ecs.store.comps[row]
+    losses = []
+    for eid, ratio in positions:
+        edge = layout.get_by_eid(eid)
+        system.manually_load_history(door_comp, edge, ratio)
+        losses.append(f(layout, samples))
+    return losses
+
+
+# ----------------- Results -----------------
+def best_states(sweep, system):
+    """Door states with the best swept position of every swept door"""
+    eids, ratios = u_parallel.to_eid_states(*system.get_states())
+    for row in np.unique(sweep["door"]):
+        door_sweep = sweep[sweep["door"] == row]
+        best = door_sweep[np.argmin(door_sweep["loss"])]
+        eids[row], ratios[row] = int(best["eid"]), float(best["ratio"])
+    return eids, ratios
+
+
+def warm_start(sweep, layout, system):
+    """Move every swept door to its best swept position"""
+    u_parallel.load_eid_states(layout, system, *best_states(sweep, system))
+
+
+def save(path, sweep):
+    np.savez_compressed(path, sweep=sweep)
+
+
+def load(path):
+    return np.load(path)["sweep"]
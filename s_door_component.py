@@ -1,16 +1,67 @@
 from typing import List
 
 
+class _StoreField:
+    """Attribute kept in a DoorStore column once the door is attached"""
+
+    def __init__(self, column, default=None):
+        self.column = column
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = "_" + name
+
+    def __get__(self, comp, owner=None):
+        if comp is None:
+            return self
+        if comp.store is None:
+            return comp.__dict__.get(self.name, self.default)
+        return comp.store.get(self.column, comp.row)
+
+    def __set__(self, comp, value):
+        if comp.store is None:
+            comp.__dict__[self.name] = value
+        else:
+            comp.store.set(self.column, comp.row, value)
+
+
 class DoorComponent:
+    # Fields stored column-wise in s_door_store.DoorStore
+    bind_edge = _StoreField("edges")  # e.g., FEdge
+    d_len = _StoreField("d_lens")
+    e_len = _StoreField("e_lens")
+    ratio = _StoreField("ratios")  # equivalent to "current position"
+    move_limit = _StoreField("move_limits")
+    hist_edge = _StoreField("hist_edges")
+    hist_ratio = _StoreField("hist_ratios")
+    is_active = _StoreField("is_active", False)
+    is_synced = _StoreField("is_synced", True)
+    need_optimization = _StoreField("need_optimization", True)
+
+    store_fields = (
+        "bind_edge",
+        "d_len",
+        "e_len",
+        "ratio",
+        "move_limit",
+        "hist_edge",
+        "hist_ratio",
+        "is_active",
+        "is_synced",
+        "need_optimization",
+    )
 
     def __init__(self, room0, room1, door_length=0.07):
-        self.bind_edge = None  # e.g., FEdge
+        self.store = None  # DoorStore, set by ECS.add_door_component
+        self.row = None
+
+        self.bind_edge = None
         self.bind_rooms: List = [room0, room1]  # e.g., [FRoom, FRoom]
 
         # Door geometry properties
         self.d_len = door_length
         self.e_len = None
-        self.ratio = None  # equivalent to "current position" of the door
+        self.ratio = None
         self.move_limit = None
 
         # Cached new geometry (vertices, edges, faces) after splitting
@@ -25,15 +76,17 @@ class DoorComponent:
         self.need_optimization = True
 
         # For storing some last-known states (history)
-        self.history = {
-            "bind_edge": None,
-            "ratio": None,
-        }
+        self.hist_edge = None
+        self.hist_ratio = None
 
     @property
     def rooms(self):
         return self.bind_rooms
 
+    @property
+    def history(self):
+        return {"bind_edge": self.hist_edge, "ratio": self.hist_ratio}
+
     def __repr__(self):
         return (
             f"DoorComponent("
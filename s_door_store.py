@@ -0,0 +1,153 @@
+import numpy as np
+
+
+class DoorStore:
+    """
+    Columnar storage of door components: one row per door.
+    Rows follow the insertion order of the ECS, so batch queries over all
+    doors are plain NumPy operations instead of loops over Python objects.
+    """
+
+    # column -> (dtype, fill value, trailing shape)
+    _COLUMNS = {
+        "entity_ids": (np.int64, -1, ()),
+        "edges": (object, None, ()),  # bound FEdge
+        "ratios": (np.float64, np.nan, ()),
+        "d_lens": (np.float64, np.nan, ()),
+        "e_lens": (np.float64, np.nan, ()),
+        "move_limits": (np.float64, np.nan, (2,)),  # lower, upper
+        "hist_edges": (object, None, ()),
+        "hist_ratios": (np.float64, np.nan, ()),
+        "is_active": (bool, False, ()),
+        "is_synced": (bool, True, ()),
+        "need_optimization": (bool, True, ()),
+        "room_ids": (np.int64, -1, (2,)),
+    }
+
+    def __init__(self, capacity=8):
+        self.n = 0
+        self.comps = []  # row -> DoorComponent
+        self.room_doors = {}  # FRoom -> [row, ...]
+
+        for name, (dtype, fill, shape) in self._COLUMNS.items():
+            setattr(self, name, np.full((capacity,) + shape, fill, dtype))
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def capacity(self):
+        return len(self.ratios)
+
+    # ----------------------------------------------------
+    # Rows
+    # ----------------------------------------------------
+    def add(self, door_comp, entity_id=-1):
+        """Append a door component and move its fields into the columns"""
+        if self.n == self.capacity:
+            self.__grow(2 * self.capacity)
+
+        fields = {f: getattr(door_comp, f) for f in door_comp.store_fields}
+        row = self.n
+        self.n += 1
+        self.comps.append(door_comp)
+        self.entity_ids[row] = entity_id
+        door_comp.store, door_comp.row = self, row
+        for field, value in fields.items():
+            setattr(door_comp, field, value)
+
+        for i, room in enumerate(door_comp.rooms):
+            if room is not None:
+                self.room_ids[row, i] = room.rid
+        # None too: doors without a room (the front door) are linked
+        for room in dict.fromkeys(door_comp.rooms):
+            self.room_doors.setdefault(room, []).append(row)
+        return row
+
+    def remove(self, row):
+        """Remove a row, keeping the order of the remaining doors"""
+        door_comp = self.comps.pop(row)
+        fields = {f: getattr(door_comp, f) for f in door_comp.store_fields}
+        door_comp.store, door_comp.row = None, None
+        for field, value in fields.items():
+            setattr(door_comp, field, value)
+
+        for name, (_, fill, _) in self._COLUMNS.items():
+            col = getattr(self, name)
+            col[row : self.n - 1] = col[row + 1 : self.n]
+            col[self.n - 1] = fill
+        self.n -= 1
+
+        for comp in self.comps[row:]:
+            comp.row -= 1
+        for room, rows in self.room_doors.items():
+            self.room_doors[room] = [r - (r > row) for r in rows if r != row]
+
+    def __grow(self, capacity):
+        for name, (dtype, fill, shape) in self._COLUMNS.items():
+            col = np.full((capacity,) + shape, fill, dtype)
+            col[: self.n] = getattr(self, name)[: self.n]
+            setattr(self, name, col)
+
+    # ----------------------------------------------------
+    # Single values (used by DoorComponent attributes)
+    # ----------------------------------------------------
+    def get(self, column, row):
+        value = getattr(self, column)[row]
+        if column == "move_limits":
+            return None if np.isnan(value).any() else value
+        if isinstance(value, np.floating):
+            return None if np.isnan(value) else float(value)
+        if isinstance(value, np.bool_):
+            return bool(value)
+        return value
+
+    def set(self, column, row, value):
+        col = getattr(self, column)
+        if value is None:
+            col[row] = self._COLUMNS[column][1]
+        else:
+            col[row] = value
+
+    # ----------------------------------------------------
+    # Batch queries
+    # ----------------------------------------------------
+    def movable_rows(self, rows=None):
+        """Rows of active doors that need optimization (within rows)"""
+        n = self.n
+        movable = np.flatnonzero(self.is_active[:n] & self.need_optimization[:n])
+        if rows is None:
+            return movable
+        return np.intersect1d(movable, rows)
+
+    def inactive_rows(self):
+        """Rows of doors that need optimization but are not active"""
+        n = self.n
+        return np.flatnonzero(~self.is_active[:n] & self.need_optimization[:n])
+
+    def rows_of_rooms(self, rooms):
+        """Sorted rows of the doors attached to any of the rooms"""
+        rows = set()
+        for room in rooms:
+            rows.update(self.room_doors.get(room, []))
+        return sorted(rows)
+
+    def doors_of_room(self, room):
+        return [self.comps[r] for r in self.room_doors.get(room, [])]
+
+    def store_history(self, rows):
+        self.hist_ratios[rows] = self.ratios[rows]
+        self.hist_edges[rows] = self.edges[rows]
+
+    def edge_changed(self, rows):
+        """Mask of rows whose bound edge differs from the stored history"""
+        return np.array(
+            [
+                e is not h
+                for e, h in zip(self.edges[rows], self.hist_edges[rows])
+            ],
+            dtype=bool,
+        )
+
+    def get_states(self):
+        return list(self.edges[: self.n]), self.ratios[: self.n].tolist()
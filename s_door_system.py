@@ -27,30 +27,35 @@ class DoorSystem:
                 continue
             self.deactivate(door_comp)
 
-    def propose(self, sigma=0.1):
-        for entity_id, door_comp in list(self.ecs.doors.items()):
-            if not door_comp.need_optimization:
-                return
+    def propose(self, sigma=0.1, rows=None):
+        """Move every optimizable door, or only those in store rows"""
+        store = self.ecs.store
+        self._warn_inactive()
 
-            if door_comp.is_active:
-                self.step(door_comp, sigma=sigma)
-            else:
-                print(f"WARNING: Door {entity_id} is not active")
+        rows = store.movable_rows(rows)
+        deltas = np.random.normal(0.0, sigma, len(rows))
+        store.store_history(rows)
+        for row, delta in zip(rows, deltas):
+            self._step_stored(store.comps[row], delta)
 
     # debug method
     def move_all_by(self, delta):
         for door_comp in self.ecs.doors.values():
             self.step(door_comp, delta)
 
-    def reject(self):
-        for entity_id, door_comp in list(self.ecs.doors.items()):
-            if not door_comp.need_optimization:
-                return
+    def reject(self, rows=None):
+        store = self.ecs.store
+        self._warn_inactive()
 
-            if door_comp.is_active:
-                self._restore_last_state(door_comp)
+        rows = store.movable_rows(rows)
+        edge_changed = store.edge_changed(rows)
+        for row, changed in zip(rows, edge_changed):
+            door_comp = store.comps[row]
+            if changed:
+                self._restore_last_edge(door_comp)
             else:
-                print(f"WARNING: Door {entity_id} is not active")
+                # didn't move to a new edge, just reset the ratio
+                self._move_to(door_comp, door_comp.hist_ratio)
 
     def load_manually(self, edges, ratios):
         for door_comp, edge, ratio in zip(
@@ -60,12 +65,7 @@ class DoorSystem:
             self.manually_load_history(door_comp, edge, ratio)
 
     def get_states(self):
-        edges = []
-        ratios = []
-        for door_comp in self.ecs.doors.values():
-            edges.append(door_comp.bind_edge)
-            ratios.append(door_comp.ratio)
-        return edges, ratios
+        return self.ecs.store.get_states()
 
     # ----------------------------------------------------
     # Basic operations on single door components
@@ -94,7 +94,7 @@ class DoorSystem:
                 if e.is_blocked:
                     continue
 
-                if f_adj in door_comp.bind_rooms[0].faces:
+                if f_adj.room is door_comp.bind_rooms[0]:
                     door_comp.bind_rooms[0].add_face(faces[1])
                     door_comp.bind_rooms[1].add_face(faces[0])
                     break
@@ -174,10 +174,13 @@ class DoorSystem:
         if delta == 0.0:
             delta = np.random.normal(delta, sigma)
 
-        ratio = door_comp.ratio + delta / door_comp.e_len
-
         # save the current state
         self._store_current_state(door_comp)
+        self._step_stored(door_comp, delta)
+
+    def _step_stored(self, door_comp, delta):
+        """Move by delta; the history must have been stored already"""
+        ratio = door_comp.ratio + delta / door_comp.e_len
 
         # move the door
         if not self._within_limit(door_comp, ratio):
@@ -187,6 +190,11 @@ class DoorSystem:
             door_comp.ratio = ratio
             self._move_by(door_comp, delta)
 
+    def _warn_inactive(self):
+        store = self.ecs.store
+        for row in store.inactive_rows():
+            print(f"WARNING: Door {store.entity_ids[row]} is not active")
+
     # ----------------------------------------------------
     # Helper methods: geometry, ratio, limiting, etc.
     # ----------------------------------------------------
@@ -225,8 +233,8 @@ class DoorSystem:
 
     def _calc_brooms_cache(self, door_comp):
         if door_comp.need_optimization:
-            door_comp.shared_edges = door_comp.bind_rooms[0].get_shared_edges(
-                door_comp.bind_rooms[1]
+            door_comp.shared_edges = self.fp.get_shared_walls(
+                *door_comp.bind_rooms
             )
             door_comp.shared_edges = [
                 e
@@ -258,6 +266,7 @@ class DoorSystem:
         door_comp.ratio = ratio
         door_comp.verts[0].xy = pos0
         door_comp.verts[1].xy = pos1
+        self.fp.moved_verts(door_comp.verts)
 
     def _move_by(self, door_comp, delta):
         # don't forget to update the door_comp.ratio
@@ -265,6 +274,7 @@ class DoorSystem:
         direction = door_comp.bind_edge.get_dir() * delta
         for v in door_comp.verts:
             v.xy += direction
+        self.fp.moved_verts(door_comp.verts)
 
     def _to_next_edge(self, door_comp, ratio):
         self.deactivate(door_comp)
@@ -319,21 +329,24 @@ class DoorSystem:
     # History
     def _store_current_state(self, door_comp):
         """Store the current state of the door component."""
-        door_comp.history["ratio"] = door_comp.ratio
-        door_comp.history["bind_edge"] = door_comp.bind_edge
+        door_comp.hist_ratio = door_comp.ratio
+        door_comp.hist_edge = door_comp.bind_edge
 
     def _restore_last_state(self, door_comp):
-        if door_comp.bind_edge == door_comp.history["bind_edge"]:
+        if door_comp.bind_edge == door_comp.hist_edge:
             # didn't move to a new edge, just reset the ratio
-            # print("restore", door_comp.history["ratio"])
-            self._move_to(door_comp, door_comp.history["ratio"])
+            # print("restore", door_comp.hist_ratio)
+            self._move_to(door_comp, door_comp.hist_ratio)
         else:
-            # reset the door to the last state: different edges
-            # print("restore edge")
-            self.deactivate(door_comp)
-            door_comp.ratio = door_comp.history["ratio"]
-            door_comp.bind_edge = door_comp.history["bind_edge"]
-            self.activate(door_comp)
+            self._restore_last_edge(door_comp)
+
+    def _restore_last_edge(self, door_comp):
+        # reset the door to the last state: different edges
+        # print("restore edge")
+        self.deactivate(door_comp)
+        door_comp.ratio = door_comp.hist_ratio
+        door_comp.bind_edge = door_comp.hist_edge
+        self.activate(door_comp)
 
     def manually_load_history(self, door_comp, edge, ratio):
         if not door_comp.need_optimization:
@@ -350,3 +363,4 @@ class DoorSystem:
             self.fp.append(door_comp.verts, door_comp.edges, door_comp.faces)
         else:
             self.fp.remove(door_comp.verts, door_comp.edges, door_comp.faces)
+        self.fp.update_shared_walls(*door_comp.bind_rooms)
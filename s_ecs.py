@@ -1,4 +1,5 @@
 # ECS (Entity-Component-System) for the door system.
+from s_door_store import DoorStore
 
 
 class ECS:
@@ -7,6 +8,7 @@ class ECS:
 
         self.doors = {}  # entity_id -> DoorComponent
         self.connections = {}  # door: adj_doors
+        self.store = DoorStore()  # columnar door data + room -> doors index
 
     def create_entity(self):
         """Generate and return a unique entity ID."""
@@ -18,11 +20,13 @@ class ECS:
         """Attach a DoorComponent to a given entity ID."""
         entity_id = self.create_entity()
         self.connections[door_comp] = []
-        for k, v in self.doors.items():
-            if set(v.rooms) & set(door_comp.rooms):
-                # use entity_id instead of door_comp
-                self.connections[door_comp].append(v)
-                self.connections[v].append(door_comp)
+        # doors sharing a room, from the room -> doors index
+        for row in self.store.rows_of_rooms(door_comp.rooms):
+            v = self.store.comps[row]
+            # use entity_id instead of door_comp
+            self.connections[door_comp].append(v)
+            self.connections[v].append(door_comp)
+        self.store.add(door_comp, entity_id)
         self.doors[entity_id] = door_comp
 
     def get_door_component(self, entity_id):
@@ -35,7 +39,14 @@ class ECS:
         """Return the DoorComponents connected to a given entity."""
         return self.connections.get(door_comp, [])
 
+    def get_doors_of_room(self, room):
+        """Return the DoorComponents attached to a given room."""
+        return self.store.doors_of_room(room)
+
     def remove_door_component(self, entity_id):
         """Remove the DoorComponent for a given entity."""
         if entity_id in self.doors:
-            del self.doors[entity_id]
+            door_comp = self.doors.pop(entity_id)
+            self.store.remove(door_comp.row)
+            for v in self.connections.pop(door_comp, []):
+                self.connections[v].remove(door_comp)
@@ -1,6 +1,8 @@
 # Constraint Delaunay Triangulation
 # use CDT python binding
 # https://github.com/artem-ogre/PythonCDT
+# Bindings with the buffer protocol (insert from arrays, *_array getters)
+# exchange whole arrays; others fall back to per-element objects.
 
 import numpy as np
 
@@ -14,19 +16,25 @@ class CDT:
             cdt.IntersectingConstraintEdges.TRY_RESOLVE,
             min_dist_to_constraint_edge,
         )
+        self.has_buffers = hasattr(self.t, "triangles_array")
 
     # input data
     def insert_vertices(self, vertices: list | np.ndarray):
+        if self.has_buffers:
+            xy = np.asarray(vertices, dtype=np.float64)[:, :2]
+            self.t.insert_vertices(np.ascontiguousarray(xy))
+            return
         self.t.insert_vertices([cdt.V2d(*v) for v in vertices])
 
     def insert_edges(self, indices: list | np.ndarray = None):
-        if indices is not None:
-            ee = [cdt.Edge(ie[0], ie[1]) for ie in indices]
-        else:
+        if indices is None:
             n = len(self.t.vertices)
-            ee = [cdt.Edge(i, i + 1) for i in range(n - 1)]
-            ee.append(cdt.Edge(n - 1, 0))
-        self.t.insert_edges(ee)
+            indices = np.stack([np.arange(n), np.roll(np.arange(n), -1)], 1)
+
+        if self.has_buffers:
+            self.t.insert_edges(np.ascontiguousarray(indices, dtype=np.uint32))
+            return
+        self.t.insert_edges([cdt.Edge(ie[0], ie[1]) for ie in indices])
 
     # settings
     def erase_super_triangle(self):
@@ -40,6 +48,9 @@ class CDT:
 
     # get data
     def get_triangles(self, to_numpy=False):
+        if to_numpy and self.has_buffers:
+            triangles = self.t.triangles_array(copy=True)["vertices"]
+            return triangles.astype(np.int64).reshape(-1, 3)
         if to_numpy:
             return np.array(
                 [
@@ -50,6 +61,9 @@ class CDT:
         return self.t.triangles
 
     def get_vertices(self, to_numpy=False):
+        if to_numpy and self.has_buffers:
+            xy = self.t.vertices_array(copy=True)
+            return np.stack([xy["x"], xy["y"]], axis=1)
         if to_numpy:
             return np.array([[v.x, v.y] for v in self.t.vertices])
         return self.t.vertices
@@ -12,9 +12,13 @@ class UConfig:
     def __init__(self, case_config, optimizer_config):
         self.random_seed = optimizer_config["random_seed"]
         self.sample_size = optimizer_config["sample_size"]
+        self.sampler = optimizer_config.get("sampler", "random")
+        self.traffic = optimizer_config.get("traffic", "path")
         self.iterations = optimizer_config["iterations"]
         self.temperature = optimizer_config["temperature"]
         self.sigma = optimizer_config["sigma"]
+        self.optimizer = optimizer_config.get("optimizer", "mh")
+        self.tries = optimizer_config.get("tries", 4)  # for "mtm"
 
         # Case-specific
         self.file_name = case_config["file_name"]
@@ -59,6 +63,14 @@ class ULoader:
         )
         return UObjLoader.load(path)
 
+    @classmethod
+    def get_case_count(cls) -> int:
+        if cls.__config is None:
+            raise RuntimeError(
+                "Configuration not loaded. Call ULoader.load_config() first."
+            )
+        return len(cls.__config["cases"])
+
     @classmethod
     def get_config(cls, case_id) -> UConfig:
         if cls.__config is None:
@@ -0,0 +1,65 @@
+"""
+On-disk cache of built floor plans.
+A layout built from an OBJ file is stored as plain arrays (vertices,
+triangles, half-edge twins, fixed edges and the faces of every room), so
+repeated runs skip OBJ parsing, the CDT and the twin search.
+Entries are keyed by the OBJ bytes and the CDT settings.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from u_obj_loader import UObjLoader
+
+CACHE_DIR = "./cache"
+VERSION = 1  # bump when the cached arrays change meaning
+
+
+def cache_key(obj_path, min_dist_to_constraint_edge=0.0):
+    with open(UObjLoader.get_path(obj_path), "rb") as f:
+        digest = hashlib.sha1(f.read())
+    digest.update(f"{VERSION} {float(min_dist_to_constraint_edge)!r}".encode())
+    return digest.hexdigest()
+
+
+def cache_path(obj_path, min_dist_to_constraint_edge=0.0, cache_dir=CACHE_DIR):
+    key = cache_key(obj_path, min_dist_to_constraint_edge)
+    name = os.path.splitext(os.path.basename(obj_path))[0]
+    return os.path.join(cache_dir, f"{name}_{key[:16]}.npz")
+
+
+def save(path, verts, triangles, twins, fixed_edges, room_faces):
+    """room_faces: face indices of every room, in rid order"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    sizes = [len(faces) for faces in room_faces]
+
+    # write then rename, so that parallel runs never read a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            verts=verts,
+            triangles=triangles,
+            twins=twins,
+            fixed_edges=fixed_edges,
+            room_faces=np.concatenate(room_faces).astype(np.int64),
+            room_offsets=np.cumsum([0] + sizes),
+        )
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """Cached arrays as a dict, or None if there is no cache entry"""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        arrays = {k: data[k] for k in data.files}
+
+    offsets = arrays.pop("room_offsets")
+    faces = arrays.pop("room_faces")
+    arrays["room_faces"] = [
+        faces[i:j] for i, j in zip(offsets[:-1], offsets[1:])
+    ]
+    return arrays
@@ -1,5 +1,12 @@
+import re
+
 import numpy as np
 
+# element lines, without the leading keyword
+_VERTEX_LINE = re.compile(r"^v (.*)$", re.M)
+_EDGE_LINE = re.compile(r"^l (.*)$", re.M)
+_FACE_LINE = re.compile(r"^f (.*)$", re.M)
+
 
 class UObjData:
     def __init__(self):
@@ -29,35 +36,35 @@ class UObjLoader:
     def set_root_dir(cls, root_dir):
         cls.__root_dir = root_dir  # Use cls instead of self
 
+    @classmethod
+    def get_path(cls, obj_path):
+        return cls.__root_dir + obj_path
+
     # ----------------- Private -----------------
     @classmethod
     def __load(cls, obj_file):
-        obj_data = cls.__load_raw_obj(cls.__root_dir + obj_file)
+        obj_data = cls.__load_raw_obj(cls.get_path(obj_file))
         cls.__optimize(obj_data)
         cls.__flip_z(obj_data)
         return obj_data
 
     @staticmethod
     def __load_raw_obj(obj_path):
+        """Read the file once and parse each element type in bulk"""
         with open(obj_path, "r") as f:
-            ls = f.readlines()
+            text = f.read()
 
-        vertices, edges, faces = [], [], []
-        for l in ls:
-            if l.startswith("v "):
-                _process_vertices(vertices, l)
-            elif l.startswith("l "):
-                _process_edges(edges, l)
-            elif l.startswith("f "):
-                _process_faces(faces, l)
+        vertices = _VERTEX_LINE.findall(text)
+        edges = _EDGE_LINE.findall(text)
+        faces = _FACE_LINE.findall(text)
 
         data = UObjData()
         if vertices:
-            data.verts = np.array(vertices, dtype=np.float64)
+            data.verts = _parse_vertices(vertices)
         if edges:
-            data.edges = np.array(edges, dtype=np.int64)
+            data.edges = _parse_edges(edges)
         if faces:
-            data.faces = np.array(faces, dtype=np.int64)
+            data.faces = _parse_faces(faces)
 
         return data
 
@@ -69,37 +76,23 @@ class UObjLoader:
 
     @staticmethod
     def __remove_duplicates(obj_data):
-        vertex_map = {}
-        unique_vertices = []
-        new_index = 0
-
-        def hash_vertex(vertex):
-            return "".join([str(round(x, 6)) for x in vertex])
-
-        for i, vertex in enumerate(obj_data.verts):
-            if hash_vertex(vertex) not in vertex_map:
-                vertex_map[hash_vertex(vertex)] = new_index
-                unique_vertices.append(vertex)
-                new_index += 1
+        # rounded coordinates as keys; + 0.0 merges -0.0 into 0.0
+        keys = np.round(obj_data.verts, 6) + 0.0
+        _, first, inverse = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True
+        )
+
+        # number unique vertices in order of first appearance
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        vertex_map = rank[inverse.ravel()]
 
         if obj_data.edges is not None:
-            obj_data.edges = [
-                (
-                    vertex_map[hash_vertex(obj_data.verts[start])],
-                    vertex_map[hash_vertex(obj_data.verts[end])],
-                )
-                for start, end in obj_data.edges
-            ]
+            obj_data.edges = vertex_map[obj_data.edges]
         if obj_data.faces is not None:
-            obj_data.faces = [
-                (
-                    vertex_map[hash_vertex(obj_data.verts[face[0]])],
-                    vertex_map[hash_vertex(obj_data.verts[face[1]])],
-                    vertex_map[hash_vertex(obj_data.verts[face[2]])],
-                )
-                for face in obj_data.faces
-            ]
-        obj_data.verts = np.array(unique_vertices)
+            obj_data.faces = vertex_map[obj_data.faces]
+        obj_data.verts = obj_data.verts[first[order]]
 
     @staticmethod
     def __normalize(obj_data):
@@ -112,30 +105,29 @@ class UObjLoader:
 
 
 # ----------------- Utility functions -----------------
-def _process_edges(edges_list, raw_data):
-    # "l 1 2 3 4" -> [0, 1, 2, 3]
-    edges_raw = [int(i) - 1 for i in raw_data.split(" ")[1:]]
-
-    if len(edges_raw) == 2:
-        edges_list.append(edges_raw)
-    elif len(edges_raw) >= 3:
-        for i in range(len(edges_raw) - 1):
-            edges_list.append([edges_raw[i], edges_raw[i + 1]])
-    return True
-
-
-def _process_faces(faces_list, raw_data):
-    # "f 1/1/1 2/2/2 3/3/3" -> [0, 1, 2] only first matter
-    face_raw = [ls.split("/")[0] for ls in raw_data.split(" ")]
-
-    if len(face_raw) != 3:
-        return False
-
-    faces_list.append([int(x) - 1 for x in face_raw[1:]])
-    return True
-
-
-def _process_vertices(vertices_list, raw_data):
-    # "v 1.0 2.0 3.0" -> [1.0, 2.0, 3.0]
-    vertices_list.append([float(x) for x in raw_data.split(" ")[1:]])
-    return True
+def _parse_edges(raw_lines):
+    # ["1 2 3 4", ...] -> [[0, 1], [1, 2], [2, 3], ...]
+    parts = [l.split() for l in raw_lines]
+    counts = np.array([len(p) for p in parts])
+    indices = np.array([i for p in parts for i in p], dtype=np.int64) - 1
+
+    # consecutive indices, except across two polylines
+    keep = np.ones(max(len(indices) - 1, 0), dtype=bool)
+    keep[np.cumsum(counts)[:-1] - 1] = False
+    return np.stack([indices[:-1][keep], indices[1:][keep]], axis=1)
+
+
+def _parse_faces(raw_lines):
+    # ["1/1/1 2/2/2 3/3/3", ...] -> [[0, 1, 2], ...] only first matter
+    parts = [l.split() for l in raw_lines]
+    faces = [[ls.split("/")[0] for ls in p] for p in parts if len(p) == 3]
+    return np.array(faces, dtype=np.int64).reshape(-1, 3) - 1
+
+
+def _parse_vertices(raw_lines):
+    # ["1.0 2.0 3.0", ...] -> [[1.0, 2.0, 3.0], ...]
+    values = np.array(" ".join(raw_lines).split(), dtype=np.float64)
+    if len(values) == 3 * len(raw_lines):
+        return values.reshape(-1, 3)
+    # optional w or colors: keep x, y, z
+    return np.array([l.split()[:3] for l in raw_lines], dtype=np.float64)
@@ -0,0 +1,55 @@
+"""
+Process-pool helpers for the optimizers.
+Layouts are mutable half-edge graphs and are not shared between processes:
+every worker builds its own copy once with a builder function, e.g.
+e_multi_optimize.build_case, which returns (layout, system, f, samples).
+Door states travel between processes as (edge ids, ratios).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+_context = None  # (layout, system, f, samples) of this worker
+
+
+def init_worker(builder, builder_args):
+    global _context
+    _context = builder(*builder_args)
+
+
+def get_context():
+    if _context is None:
+        raise RuntimeError("Worker not initialized. Use create_pool().")
+    return _context
+
+
+def create_pool(workers, builder, builder_args=()):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(builder, builder_args),
+    )
+
+
+# ----------------- Door states -----------------
+def to_eid_states(edges, ratios):
+    return [e.eid for e in edges], list(ratios)
+
+
+def from_eid_states(layout, eids, ratios):
+    return [layout.get_by_eid(eid) for eid in eids], list(ratios)
+
+
+def load_eid_states(layout, system, eids, ratios, rows=None):
+    """Load door states (for the given store rows only, if provided)"""
+    edges, ratios = from_eid_states(layout, eids, ratios)
+    store = system.ecs.store
+    rows = range(store.n) if rows is None else rows
+    for row in rows:
+        system.manually_load_history(store.comps[row], edges[row], ratios[row])
+
+
+def evaluate_states(eids, ratios):
+    """Worker task: objective value of the door states on this worker"""
+    layout, system, f, samples = get_context()
+    load_eid_states(layout, system, eids, ratios)
+    return f(layout, samples)
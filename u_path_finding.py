@@ -50,3 +50,185 @@ def a_star(
                 ]:  # Avoid duplicate nodes
                     heapq.heappush(open_set, (f_score[neighbor], neighbor))
     return None, float("inf")
+
+
+def a_star_indexed(adjacency, h, start, end, expanded=None):
+    """
+    a_star over the integer ids of a FaceGraph: same expansion order and
+    result, without face objects. adjacency is FaceGraph.adjacency and h
+    the heuristic to end of every id. Returns (ids, cost); the expanded
+    ids are appended to the expanded list if one is given.
+    """
+    indptr, indices, blocked, weights = adjacency
+    inf = float("inf")
+
+    open_set = [(0, start)]
+    in_open = {start}
+    came_from = {}
+    g_score = {start: 0}
+    f_score = {start: h[start]}
+
+    while open_set:
+        current = heapq.heappop(open_set)[1]
+        in_open.discard(current)
+        if expanded is not None:
+            expanded.append(current)
+        if current == end:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            path.append(start)
+            return path[::-1], f_score[end]
+
+        g = g_score[current]
+        for k in range(indptr[current], indptr[current + 1]):
+            if blocked[k]:
+                continue
+            neighbor = indices[k]
+            t_g_score = g + weights[k]
+            if t_g_score < g_score.get(neighbor, inf):
+                came_from[neighbor] = current
+                g_score[neighbor] = t_g_score
+                f_score[neighbor] = t_g_score + h[neighbor]
+                if neighbor not in in_open:  # as a_star: no duplicates
+                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                    in_open.add(neighbor)
+    return None, inf
+
+
+def bidirectional_indexed(
+    adjacency, blocked_in, start, end, potential=None, expanded=None
+):
+    """
+    Bidirectional search between two ids of a FaceGraph. The forward
+    search from start and the backward search from end (over blocked_in,
+    the blocked flags of the reversed entries) take turns by the smaller
+    radius. Every edge between the two labeled sets bounds the best path;
+    the search stops once the two radii add up to that bound.
+    Without potential this is bidirectional Dijkstra. A potential p with
+    w(u, v) - p(u) + p(v) >= 0 for every edge, such as the average
+    (h_end - h_start) / 2 of two consistent heuristics, makes it
+    bidirectional A* on the reduced weights.
+    Returns (ids, cost) and fills expanded as a_star_indexed.
+    """
+    indptr, indices, blocked, weights = adjacency
+    inf = float("inf")
+    if start == end:
+        return [start], 0
+    p = potential if potential is not None else [0.0] * (len(indptr) - 1)
+
+    dist = ({start: 0.0}, {end: 0.0})
+    came_from = ({}, {})
+    settled = (set(), set())
+    open_sets = ([(0.0, start)], [(0.0, end)])
+    masks = (blocked, blocked_in)
+    best, meet = inf, None
+
+    while open_sets[0] and open_sets[1]:
+        radius = (open_sets[0][0][0], open_sets[1][0][0])
+        if radius[0] + radius[1] >= best:
+            break
+        side = 0 if radius[0] <= radius[1] else 1
+        g, current = heapq.heappop(open_sets[side])
+        if current in settled[side]:
+            continue  # outdated entry
+        settled[side].add(current)
+        if expanded is not None:
+            expanded.append(current)
+
+        d, other = dist[side], dist[1 - side]
+        sign = 1 if side == 0 else -1
+        for k in range(indptr[current], indptr[current + 1]):
+            if masks[side][k]:
+                continue
+            neighbor = indices[k]
+            reduced = weights[k] + sign * (p[neighbor] - p[current])
+            t_g_score = g + reduced
+            if t_g_score < d.get(neighbor, inf):
+                d[neighbor] = t_g_score
+                came_from[side][neighbor] = current
+                heapq.heappush(open_sets[side], (t_g_score, neighbor))
+            if neighbor in other and t_g_score + other[neighbor] < best:
+                best = t_g_score + other[neighbor]
+                # forward end and backward end of the connecting edge
+                meet = (current, neighbor) if side == 0 else (neighbor, current)
+
+    if meet is None:
+        return None, inf
+    path = [meet[0]]
+    while path[-1] in came_from[0]:
+        path.append(came_from[0][path[-1]])
+    path = path[::-1] + [meet[1]]
+    while path[-1] in came_from[1]:
+        path.append(came_from[1][path[-1]])
+    return path, best + p[start] - p[end]
+
+
+def dijkstra_indexed(adjacency, start):
+    """Distances from id start to every id of a FaceGraph (inf if none)"""
+    indptr, indices, blocked, weights = adjacency
+    dist = [float("inf")] * (len(indptr) - 1)
+    dist[start] = 0.0
+
+    open_set = [(0.0, start)]
+    while open_set:
+        g, current = heapq.heappop(open_set)
+        if g > dist[current]:
+            continue  # outdated entry
+        for k in range(indptr[current], indptr[current + 1]):
+            if blocked[k]:
+                continue
+            neighbor = indices[k]
+            if g + weights[k] < dist[neighbor]:
+                dist[neighbor] = g + weights[k]
+                heapq.heappush(open_set, (dist[neighbor], neighbor))
+    return dist
+
+
+def dijkstra_many(start: Point, targets, dist_func=None):
+    """
+    Shortest paths from start to every target in one expansion.
+    The search stops once all reachable targets are settled.
+    Returns one path per target (None if unreachable).
+    """
+    if dist_func is None:
+        dist_func = euclidean_distance
+
+    remaining = set(t for t in targets if t is not None)
+    if start is None:
+        remaining = set()
+
+    open_set = [(0, start)] if start is not None else []
+    came_from = {}
+    g_score = {start: 0}
+    settled = set()
+
+    while open_set and remaining:
+        g, current = heapq.heappop(open_set)
+        if current in settled:
+            continue  # outdated entry
+        settled.add(current)
+        remaining.discard(current)
+
+        for neighbor in current.neighbors:
+            if neighbor in settled:
+                continue
+            if current.get_shared_edge(neighbor).is_blocked:
+                continue  # Skip blocked edges
+
+            t_g_score = g + dist_func(current, neighbor)
+            if t_g_score < g_score.get(neighbor, float("inf")):
+                came_from[neighbor] = current
+                g_score[neighbor] = t_g_score
+                heapq.heappush(open_set, (t_g_score, neighbor))
+
+    def backtrack(target):
+        if target is None or target not in settled:
+            return None
+        path = [target]
+        while path[-1] in came_from:
+            path.append(came_from[path[-1]])
+        return path[::-1]
+
+    return [backtrack(t) for t in targets]
@@ -0,0 +1,30 @@
+"""
+Quasi-random (low-discrepancy) sequences for sampling.
+Halton points scrambled with one random digit permutation per base and
+digit position, so that higher dimensions do not correlate and repeated
+draws give independent randomized estimates.
+"""
+
+import numpy as np
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def scrambled_halton(n, dim, rng=None, start=0):
+    """n points of the dim-dimensional Halton sequence in [0, 1)^dim"""
+    assert dim <= len(PRIMES), f"At most {len(PRIMES)} dimensions"
+    rng = np.random if rng is None else rng
+
+    index = np.arange(start, start + n)
+    points = np.empty((n, dim))
+    for d, base in enumerate(PRIMES[:dim]):
+        # enough digits for double precision
+        n_digits = int(np.ceil(53 * np.log(2) / np.log(base)))
+        x, k, scale = index.copy(), np.zeros(n), 1.0 / base
+        for _ in range(n_digits):
+            perm = rng.permutation(base)
+            k += perm[x % base] * scale
+            x //= base
+            scale /= base
+        points[:, d] = k
+    return points
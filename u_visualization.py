@@ -110,16 +110,15 @@ class Visualizer:
         return self
 
     def draw_connection(self, fp, c="g", lw=2):
-        if fp.adj_m is None:
+        if fp.room_graph is None:
             fp.set_room_connections()
 
-        for i in range(len(fp.adj_m)):
-            r0 = fp.get_by_rid(i)
-            c0 = r0.get_center()
-            for j in range(i + 1, len(fp.adj_m)):
-                if fp.adj_m[i, j] == 1:
-                    r1 = fp.get_by_rid(j)
-                    c1 = r1.get_center()
+        graph = fp.room_graph
+        for i in range(graph.n):
+            c0 = graph.centers[i]
+            for j in graph.neighbors(i):
+                if j > i:
+                    c1 = graph.centers[j]
                     self.ax.plot(
                         [c0[0], c1[0]],
                         [c0[1], c1[1]],
@@ -0,0 +1,82 @@
+import os
+import unittest
+
+import numpy as np
+
+import e_multi_optimize
+from o_block_optimizer import (
+    BlockOptimizer,
+    group_rooms,
+    local_samples,
+    partition_doors,
+)
+import u_parallel
+
+CASE_ID = 2  # final_2: every door opens into the hall, room 2
+
+
+class BlockOptimizerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # configs.toml and its asset paths are relative to the repository
+        cls.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def optimize(self, workers):
+        fp, system, f, samples = e_multi_optimize.build_case(CASE_ID)
+        opt = BlockOptimizer(
+            fp,
+            system,
+            f,
+            0.01,
+            samples,
+            builder=None if workers == 1 else e_multi_optimize.build_case,
+            builder_args=(CASE_ID,),
+            workers=workers,
+        )
+        runs = []
+        for seed in [0, 10]:  # the second run continues from the first
+            score = opt.run(5, sigma=0.01, seed=seed)
+            states = u_parallel.to_eid_states(*system.get_states())
+            runs.append((score, list(opt.group_scores), states))
+        return runs
+
+    def test_partition_final_2(self):
+        fp, system, f, samples = e_multi_optimize.build_case(CASE_ID)
+        store = system.ecs.store
+        rooms = [[r.rid for r in store.comps[row].rooms] for row in range(5)]
+        self.assertEqual(rooms, [[0, 2], [1, 2], [2, 3], [2, 4], [2, 5]])
+
+        # rooms 0, 3, 4 and 5 touch each other around the hall, room 1 not
+        self.assertEqual(partition_doors(system.ecs), [[0, 2, 3, 4], [1]])
+        self.assertEqual(
+            partition_doors(system.ecs, hops=0), [[0], [1], [2], [3], [4]]
+        )
+
+        for rows in partition_doors(system.ecs):
+            rooms = group_rooms(system.ecs, rows)
+            local = local_samples(fp, samples, rooms)
+            self.assertLess(len(local), len(samples))
+            self.assertTrue(
+                all(face.room in rooms for face in fp.locate_points(local))
+            )
+
+    def test_parallel_matches_serial(self):
+        serial = self.optimize(workers=1)
+        parallel = self.optimize(workers=2)
+
+        for (s_score, s_groups, s_states), (p_score, p_groups, p_states) in zip(
+            serial, parallel
+        ):
+            self.assertAlmostEqual(s_score, p_score)
+            np.testing.assert_allclose(s_groups, p_groups)
+            self.assertEqual(s_states[0], p_states[0])
+            np.testing.assert_allclose(s_states[1], p_states[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
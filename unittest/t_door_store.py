@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from s_door_component import DoorComponent
+from s_ecs import ECS
+
+
+class _Room:
+    def __init__(self, rid):
+        self.rid = rid
+
+
+class DoorStoreTest(unittest.TestCase):
+    def create_ecs(self):
+        self.rooms = [_Room(i) for i in range(4)]
+        r = self.rooms
+        ecs = ECS()
+        for ra, rb in [(r[0], r[1]), (r[1], r[2]), (r[2], r[3])]:
+            door = DoorComponent(ra, rb)
+            door.ratio = 0.5
+            ecs.add_door_component(door)
+        return ecs
+
+    def test_fields_in_columns(self):
+        ecs = self.create_ecs()
+        door = ecs.get_door_component(1)
+        door.ratio = 0.25
+        door.move_limit = [0.1, 0.9]
+
+        self.assertEqual(ecs.store.ratios[door.row], 0.25)
+        self.assertEqual(door.e_len, None)
+        self.assertTrue(door.need_optimization)
+        np.testing.assert_array_equal(door.move_limit, [0.1, 0.9])
+
+    def test_room_index(self):
+        ecs = self.create_ecs()
+        d0, d1, d2 = [ecs.get_door_component(i) for i in range(3)]
+
+        self.assertEqual(ecs.get_adjacent_doors(d1), [d0, d2])
+        self.assertEqual(ecs.get_doors_of_room(self.rooms[2]), [d1, d2])
+
+        ecs.remove_door_component(0)
+        self.assertEqual(d1.row, 0)
+        self.assertEqual(ecs.store.entity_ids[d1.row], 1)
+        self.assertEqual(d0.ratio, 0.5)  # detached door keeps its values
+        self.assertEqual(ecs.get_adjacent_doors(d1), [d2])
+        self.assertEqual(ecs.get_doors_of_room(self.rooms[1]), [d1])
+
+    def test_doors_without_rooms(self):
+        ecs = self.create_ecs()
+        r = self.rooms
+        outer = [DoorComponent(None, None), DoorComponent(r[0], None)]
+        for door in outer:
+            ecs.add_door_component(door)
+        d0 = ecs.get_door_component(0)
+
+        # linked through the missing room, as the ECS always did
+        self.assertEqual(ecs.get_adjacent_doors(outer[0]), [outer[1]])
+        self.assertEqual(ecs.get_adjacent_doors(outer[1]), [d0, outer[0]])
+        self.assertEqual(ecs.get_doors_of_room(None), outer)
+        np.testing.assert_array_equal(ecs.store.room_ids[outer[1].row], [0, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
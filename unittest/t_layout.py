@@ -0,0 +1,85 @@
+import unittest
+
+from f_layout import FLayout
+from s_door_component import DoorComponent
+from s_door_system import DoorSystem
+from s_ecs import ECS
+from u_obj_loader import UObjLoader
+
+CASES = ["final_0", "final_2", "fp_w_walls_2", "fp_w_walls_4"]
+
+
+def recursive_rooms(fp):
+    """Faces of every room, labeled by the recursive flood fill"""
+
+    def visit_face(f, room):
+        if f.is_visited:
+            return
+        f.visit()
+        room.add(f)
+        for fa in f.adjs:
+            if f.get_shared_edge(fa).is_blocked:
+                continue
+            visit_face(fa, room)
+
+    fp.reset_all_visit_status(fp.faces)
+    rooms = []
+    not_visited = fp.faces.copy()
+    while not_visited:
+        rooms.append(set())
+        visit_face(not_visited.pop(), rooms[-1])
+        not_visited = [f for f in fp.faces if not f.is_visited]
+    return rooms
+
+
+class LayoutTest(unittest.TestCase):
+    def create_layout(self, file_name):
+        fp = FLayout()
+        fp.from_obj_data(UObjLoader.load(f"/../assets/{file_name}.obj"))
+        fp.init_rooms()
+        return fp
+
+    def test_rooms_same_as_recursive(self):
+        for file_name in CASES:
+            fp = self.create_layout(file_name)
+            rooms = sorted(fp.rooms, key=lambda r: r.rid)
+            self.assertEqual([r.rid for r in rooms], list(range(len(rooms))))
+            self.assertEqual(recursive_rooms(fp), [set(r.faces) for r in rooms])
+
+    def test_same_rooms_when_rebuilt(self):
+        def rooms(fp):
+            return sorted(
+                (r.rid, sorted(f.fid for f in r.faces)) for r in fp.rooms
+            )
+
+        built = rooms(self.create_layout("final_2"))
+        self.create_layout("final_0")
+        self.assertEqual(rooms(self.create_layout("final_2")), built)
+
+    def test_shared_walls_after_door_split(self):
+        fp = self.create_layout("final_2")
+        fp.set_room_connections()
+        fp.set_shared_walls()
+        system = DoorSystem(ECS(), fp)
+
+        def assert_same_as_rebuilt():
+            kept = fp.shared_walls
+            fp.set_shared_walls()
+            self.assertEqual(kept, fp.shared_walls)
+
+        doors = []
+        for rid in [4, 3, 0]:
+            door = DoorComponent(fp.get_by_rid(2), fp.get_by_rid(rid))
+            door.ratio = 0.5
+            system.ecs.add_door_component(door)
+            system._calc_brooms_cache(door)  # from the kept shared walls
+            system.activate(door)
+            assert_same_as_rebuilt()
+            doors.append(door)
+
+        system.deactivate(doors[0])
+        assert_same_as_rebuilt()
+
+
+if __name__ == "__main__":
+    unittest.main()
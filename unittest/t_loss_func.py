@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from g_navmesh import NavMesh
+from g_primitives import Point
+from g_primitives import _GeoBase
+from o_loss_func import (
+    entrance_loss_func,
+    pad_paths,
+    path_lengths,
+    traffic_loss_func,
+)
+from u_obj_loader import UObjLoader
+
+
+def loop_path_length(path):
+    return sum(
+        np.linalg.norm(path[i].xy - path[i + 1].xy)
+        for i in range(len(path) - 1)
+    )
+
+
+def loop_entrance_loss(doors, target_dist=0.1):
+    """Every ordered pair, so each pair counts twice"""
+    loss = 0
+    for d in doors:
+        for dd in doors:
+            if d == dd:
+                continue
+            dist = np.linalg.norm(d.xy - dd.xy)
+            if dist < target_dist:
+                loss += (target_dist - dist) ** 2
+    return loss
+
+
+class LossFuncTest(unittest.TestCase):
+    def test_same_as_loops(self):
+        _GeoBase.reset_guid()
+        nm = NavMesh()
+        nm.from_obj_data(UObjLoader.load("/../assets/fp_w_walls_4.obj"))
+
+        xy, _ = nm.sample_points(200, np.random.default_rng(0))
+        points = [Point(p) for p in xy]
+        paths = []
+        for start, end in zip(points[:-1], points[1:]):
+            path = nm.simplify(nm.find_tripath(start, end), start, end)
+            if path:
+                paths.append(path)
+        self.assertGreater(max(map(len, paths)), 2)  # some paths turn
+
+        expected_res = [loop_path_length(path) for path in paths]
+        np.testing.assert_allclose(
+            [traffic_loss_func(path) for path in paths], expected_res
+        )
+        np.testing.assert_allclose(path_lengths(pad_paths(paths)), expected_res)
+
+        doors = points[:40]
+        self.assertAlmostEqual(
+            entrance_loss_func(doors, 0.2), loop_entrance_loss(doors, 0.2) / 2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from f_layout import FLayout
+
+
+def describe(fp):
+    """Geometry, walls and rooms of a layout, by face id"""
+    faces = sorted(fp.faces)
+    return (
+        np.array([[v.xy for v in f.verts] for f in faces]),
+        [[(e.is_blocked, e.twin is None) for e in f.edges] for f in faces],
+        sorted(sorted(f.fid for f in room.faces) for room in fp.rooms),
+    )
+
+
+def build(obj_path, cache_dir):
+    """
+    Layout of an OBJ file through the cache, described; the layout is
+    dropped before the next one resets the ids
+    """
+    fp = FLayout()
+    fp.from_obj_file(obj_path, cache_dir=cache_dir)
+    return describe(fp)
+
+
+class MeshCacheTest(unittest.TestCase):
+    def test_hit_same_as_miss(self):
+        obj_path = "/../assets/final_2.obj"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            built = build(obj_path, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)  # no temp file
+            loaded = build(obj_path, cache_dir)
+
+        np.testing.assert_array_equal(built[0], loaded[0])
+        self.assertEqual(built[1], loaded[1])
+        self.assertEqual(built[2], loaded[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,15 +2,64 @@ import unittest
 
 import numpy as np
 
+from g_face_graph import FaceGraph
 from g_navmesh import NavMesh
 from g_primitives import Point
 from g_primitives import _GeoBase
+from u_geometry import remove_vertex, split_half_edge
 from u_obj_loader import UObjLoader
+from u_path_finding import a_star, a_star_indexed
 from u_visualization import Visualizer
 
 should_draw = True
 
 
+def path_length(path):
+    xy = np.array([p.xy for p in path])
+    return np.sum(np.linalg.norm(np.diff(xy, axis=0), axis=1))
+
+
+def crosses_wall(nm, path):
+    """Whether a segment of path leaves the mesh or crosses a wall"""
+    walls = [e for e in nm.edges if e.twin is None or e.is_blocked]
+    a = np.array([e.ori.xy for e in walls])
+    b = np.array([e.to.xy for e in walls])
+
+    def cross(o, u, v):
+        return (u[..., 0] - o[..., 0]) * (v[..., 1] - o[..., 1]) - (
+            u[..., 1] - o[..., 1]
+        ) * (v[..., 0] - o[..., 0])
+
+    edge_a = np.array([e.ori.xy for e in nm.edges])
+    edge_ab = np.array([e.to.xy for e in nm.edges]) - edge_a
+
+    def on_edge(xy):
+        t = np.sum((xy - edge_a) * edge_ab, axis=1)
+        t = np.clip(t / np.sum(edge_ab * edge_ab, axis=1), 0, 1)
+        closest = edge_a + t[:, None] * edge_ab
+        return np.min(np.linalg.norm(closest - xy, axis=1)) < 1e-9
+
+    t = np.linspace(0, 1, 21)[1:-1, None]
+    for p, q in zip(path[:-1], path[1:]):
+        p, q = p.xy, q.xy
+        xy = p + t * (q - p)
+        for f, point in zip(nm.locate_points(xy), xy):
+            if f is None and not on_edge(point):  # not rounded off an edge
+                return True
+        crossed = (cross(p, q, a) * cross(p, q, b) < 0) & (
+            cross(a, b, p) * cross(a, b, q) < 0
+        )
+        if crossed.any():
+            return True
+    return False
+
+
+def sample_pairs(nm, n):
+    """n (start, end) points sampled inside the mesh"""
+    xy, _ = nm.sample_points(2 * n)
+    return [(Point(xy[i]), Point(xy[i + 1])) for i in range(0, 2 * n, 2)]
+
+
 class NavmeshTest(unittest.TestCase):
     def reset(self):
         _GeoBase.reset_guid()
@@ -67,6 +116,205 @@ class NavmeshTest(unittest.TestCase):
         observed_res = [p.guid for p in path]
         self.assertEqual(expected_res, observed_res)
 
+    def test_sample_points(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_w_walls_4")
+        faces = sorted(nm.faces)
+        ids = {f: i for i, f in enumerate(faces)}
+        area = np.array([f.area for f in faces])
+        expected = 20000 * area / area.sum()
+
+        for method in ["random", "halton"]:
+            rng = np.random.default_rng(0)
+            xy, sampled = nm.sample_points(20000, rng, method)
+            for p, f in zip(xy[:500], sampled):
+                self.assertTrue(nm.is_inside_face(Point(p), f))
+
+            counts = np.bincount(
+                [ids[f] for f in sampled], minlength=len(faces)
+            )
+            # within 5 standard deviations of the area share
+            np.testing.assert_array_less(
+                np.abs(counts - expected), 5 * np.sqrt(expected) + 1
+            )
+
+    def test_indexed_path(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_wo_wall_4")
+
+        faces = sorted(nm.faces)
+        pairs = np.random.randint(0, len(faces), (100, 2))
+        for i, j in pairs:
+            expected_res = a_star(faces[i], faces[j])[0]
+            observed_res = nm.find_face_path(faces[i], faces[j])
+            self.assertEqual(expected_res, observed_res)
+
+    def test_face_graph_after_splits(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_w_walls_4")
+        graph = nm.get_face_graph()
+
+        def assert_same_as_rebuilt():
+            expected_res = FaceGraph(nm.faces)
+            observed_res = nm.get_face_graph()
+            self.assertIs(observed_res, graph)
+            self.assertEqual(expected_res.faces, observed_res.faces)
+            for name in ["indptr", "indices", "blocked", "across", "weights"]:
+                np.testing.assert_array_equal(
+                    getattr(expected_res, name), getattr(observed_res, name)
+                )
+            self.assertEqual(expected_res.blocked_in, observed_res.blocked_in)
+
+        edges = sorted(nm.edges, key=lambda e: e.eid)
+        edges = [e for e in edges if e.twin is not None and not e.is_blocked]
+        cuts = []
+        for i in np.random.choice(len(edges), 10, replace=False):
+            e = edges[i]
+            v, e_new, f_new = split_half_edge(e, (e.ori.xy + e.to.xy) / 2)
+            nm.append(v, e_new, f_new)
+            cuts += v
+            if len(cuts) % 3 == 0:
+                assert_same_as_rebuilt()
+
+        for v in cuts[:4:-1]:  # latest first, as doors are deactivated
+            v_del, e_del, f_del = remove_vertex(v)
+            nm.remove(v_del, e_del, f_del)
+        assert_same_as_rebuilt()
+
+    def test_landmark_path(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_w_walls_4")
+        graph = nm.get_face_graph()
+        nm.set_landmarks(4)
+        alt_graph = nm.get_face_graph()
+
+        pairs = np.random.randint(0, len(graph), (100, 2))
+        for i, j in pairs:
+            _, expected_res = a_star_indexed(
+                graph.adjacency, graph.heuristic(j), i, j
+            )
+            _, observed_res = a_star_indexed(
+                alt_graph.adjacency, alt_graph.heuristic(j), i, j
+            )
+            self.assertAlmostEqual(expected_res, observed_res)
+
+    def test_landmark_path_after_slides(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_w_walls_4")
+        nm.set_landmarks(4)
+        graph = nm.get_face_graph()
+
+        edges = sorted(nm.edges, key=lambda e: e.eid)
+        edges = [e for e in edges if e.twin is not None and not e.is_blocked]
+        e = edges[len(edges) // 2]
+        ori, to = e.ori.xy, e.to.xy
+        v, e_new, f_new = split_half_edge(e, (ori + to) / 2)
+        nm.append(v, e_new, f_new)
+
+        kept = None
+        for t in np.linspace(0.3, 0.7, 5):  # slide the vertex along the edge
+            v[0].xy = ori + t * (to - ori)
+            nm.moved_verts(v)
+            if kept is not None:  # same faces moved: distances kept
+                self.assertIs(kept, graph.landmark_dist)
+            plain = FaceGraph(nm.faces)
+            for i, j in np.random.randint(0, len(graph), (20, 2)):
+                _, expected_res = a_star_indexed(
+                    plain.adjacency, plain.heuristic(j), i, j
+                )
+                _, observed_res = a_star_indexed(
+                    graph.adjacency, graph.heuristic(j), i, j
+                )
+                self.assertAlmostEqual(expected_res, observed_res)
+            kept = graph.landmark_dist
+
+    def test_bidirectional_path(self):
+        self.reset()
+        obj_name = "fp_wo_wall_4"
+        nm = self.generate_navmesh(obj_name)
+
+        start = Point(np.array([0.78, 0.83]))
+        end = Point(np.array([0.67, 0.8]))
+
+        tripath = nm.find_tripath(start, end, method="bidirectional")
+        path = nm.simplify(tripath, start, end)
+
+        expected_res = [372, 34, 33, 28, 25, 24, 22, 21, 20, 8, 9, 13, 373]
+        observed_res = [p.guid for p in path]
+        self.assertEqual(expected_res, observed_res)
+
+    def test_line_of_sight(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_w_walls_4")
+        graph = nm.get_face_graph()
+
+        xy = np.random.rand(200, 2)
+        faces = nm.locate_points(xy)
+        ids = [-1 if f is None else graph.ids[f] for f in faces]
+        in_sight = graph.in_sight(xy[:-1], xy[1:], ids[:-1])
+        for i, observed_res in enumerate(in_sight):
+            start, end = Point(xy[i]), Point(xy[i + 1])
+            tripath = nm.walk_segment(start, end, faces[i])
+            self.assertEqual(tripath is not None, observed_res)
+            if tripath is not None:
+                path = nm.simplify(tripath, start, end)
+                self.assertEqual([start, end], path)
+
+    def test_corner_path(self):
+        self.reset()
+        nm = self.generate_navmesh("fp_w_walls_4")
+
+        for start, end in sample_pairs(nm, 50):
+            path = nm.simplify(nm.find_tripath(start, end), start, end)
+            corner_path = nm.find_corner_path(start, end)
+            self.assertEqual(path is None, corner_path is None)
+            if path is not None:
+                self.assertFalse(crosses_wall(nm, corner_path))
+                self.assertLessEqual(
+                    path_length(corner_path), path_length(path) + 1e-9
+                )
+
+    def test_corner_path_closed_rooms(self):
+        self.reset()
+        nm = self.generate_navmesh("final_2")  # no door open
+
+        for start, end in sample_pairs(nm, 100):
+            tripath = nm.find_tripath(start, end)
+            corner_path = nm.find_corner_path(start, end)
+            self.assertEqual(tripath is None, corner_path is None)
+            if corner_path is not None:
+                self.assertFalse(crosses_wall(nm, corner_path))
+
+    def test_corner_path_no_corners(self):
+        self.reset()
+        for obj_name in ["fp_closed_rooms_0", "fp_closed_rooms_6"]:
+            nm = self.generate_navmesh(obj_name)
+            self.assertEqual(len(nm.get_visibility_graph()), 0)
+
+            for start, end in sample_pairs(nm, 20):
+                tripath = nm.find_tripath(start, end)
+                corner_path = nm.find_corner_path(start, end)
+                self.assertEqual(tripath is None, corner_path is None)
+
+    def test_region_path(self):
+        self.reset()
+        for obj_name in ["fp_w_walls_0", "fp_w_walls_4"]:
+            nm = self.generate_navmesh(obj_name)
+            regions = nm.get_region_graph()
+            self.assertLess(len(regions), len(nm.faces))
+
+            for start, end in sample_pairs(nm, 150):
+                path = nm.simplify(nm.find_tripath(start, end), start, end)
+                region_path = nm.find_region_path(start, end)
+                self.assertEqual(path is None, region_path is None)
+                if region_path is not None:
+                    self.assertEqual(region_path[0], start)
+                    self.assertEqual(region_path[-1], end)
+                    self.assertAlmostEqual(
+                        path_length(path), path_length(region_path)
+                    )
+                    self.assertFalse(crosses_wall(nm, region_path))
+
 
 if __name__ == "__main__":
     unittest.main()
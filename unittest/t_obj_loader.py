@@ -0,0 +1,57 @@
+import glob
+import os
+import unittest
+
+import numpy as np
+
+from u_obj_loader import UObjLoader
+
+
+def load_line_by_line(obj_path):
+    """The per-line parser the vectorized loader replaced: (verts, edges)"""
+    verts, edges = [], []
+    with open(obj_path, "r") as f:
+        for l in f.readlines():
+            if l.startswith("v "):
+                verts.append([float(x) for x in l.split(" ")[1:]])
+            elif l.startswith("l "):
+                ids = [int(i) - 1 for i in l.split(" ")[1:]]
+                edges += [ids[i : i + 2] for i in range(len(ids) - 1)]
+
+    def hash_vertex(vertex):
+        return "".join([str(round(x, 6)) for x in vertex])
+
+    vertex_map, unique_verts = {}, []
+    for vertex in verts:
+        if hash_vertex(vertex) not in vertex_map:
+            vertex_map[hash_vertex(vertex)] = len(unique_verts)
+            unique_verts.append(vertex)
+    edges = [
+        [vertex_map[hash_vertex(verts[a])], vertex_map[hash_vertex(verts[b])]]
+        for a, b in edges
+    ]
+
+    xy = np.delete(np.array(unique_verts), 1, 1)
+    xy = (xy - np.min(xy)) / (np.max(xy) - np.min(xy))
+    xy[:, 1] = 1 - xy[:, 1]
+    return xy, np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+class ObjLoaderTest(unittest.TestCase):
+    def test_same_as_line_by_line(self):
+        paths = sorted(glob.glob(UObjLoader.get_path("/../assets/*.obj")))
+        self.assertGreater(len(paths), 0)
+        for path in paths:
+            name = os.path.basename(path)
+            data = UObjLoader.load(f"/../assets/{name}")
+            verts, edges = load_line_by_line(path)
+
+            np.testing.assert_array_equal(data.verts, verts, err_msg=name)
+            if data.edges is None:  # no polylines in the file
+                self.assertEqual(len(edges), 0, msg=name)
+            else:
+                np.testing.assert_array_equal(data.edges, edges, err_msg=name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import heapq
+import os
+import unittest
+
+import numpy as np
+
+import e_multi_optimize
+from o_od_traffic import ODTrafficLoss
+
+CASE_ID = 2  # final_2
+
+
+def dijkstra_room_costs(od, system, n_rooms):
+    """
+    Room to room costs by Dijkstra on the door graph: a room reaches its
+    doors, doors of a shared room reach each other, rooms are not passed
+    """
+    store = system.ecs.store
+    doors = []
+    for row in range(store.n):
+        door_comp = store.comps[row]
+        if door_comp.is_active and None not in door_comp.rooms:
+            xy = system.ratio_to_xy(door_comp, door_comp.ratio)
+            doors.append((xy, [room.rid for room in door_comp.rooms]))
+
+    def to_door(rid, xy):
+        diff = od.mean[rid] - xy
+        return np.sqrt(diff @ diff + od.var[rid])
+
+    costs = np.full((n_rooms, n_rooms), np.inf)
+    for source in range(n_rooms):
+        dist = [np.inf] * len(doors)
+        heap = [(to_door(source, xy), d) for d, (xy, rids) in enumerate(doors)]
+        heap = [(c, d) for c, d in heap if source in doors[d][1]]
+        heapq.heapify(heap)
+        while heap:
+            c, d = heapq.heappop(heap)
+            if c >= dist[d]:
+                continue
+            dist[d] = c
+            xy, rids = doors[d]
+            for rid in rids:
+                costs[source, rid] = min(
+                    costs[source, rid], c + to_door(rid, xy)
+                )
+            for e, (xy_e, rids_e) in enumerate(doors):
+                if set(rids) & set(rids_e):
+                    heapq.heappush(heap, (c + np.linalg.norm(xy - xy_e), e))
+    return costs
+
+
+def ranks(x):
+    return np.argsort(np.argsort(x))
+
+
+class ODTrafficTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # configs.toml and its asset paths are relative to the repository
+        cls.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def build(self, doors=None):
+        self.fp, config = e_multi_optimize.init_layout(CASE_ID, seed=0)
+        if doors is not None:
+            config.doors = doors
+        self.system = e_multi_optimize.create_door_system(self.fp, config)
+        self.samples = e_multi_optimize.make_sample_points(self.fp, 400)
+        self.od = ODTrafficLoss(self.system)
+        self.od(self.fp, self.samples)
+
+    def test_room_costs_same_as_dijkstra(self):
+        # 1 -> 4 crosses three doors; rooms 0 and 5 are cut off
+        for doors in [None, [[1, 2], [2, 3], [3, 4], [0, 5]]]:
+            self.build(doors)
+            n_rooms = len(self.fp.rooms)
+            for _ in range(5):
+                np.testing.assert_allclose(
+                    self.od.room_costs(self.fp),
+                    dijkstra_room_costs(self.od, self.system, n_rooms),
+                )
+                self.system.propose(sigma=0.05)
+
+    def test_ranks_moves_as_traffic_loss(self):
+        self.build()
+        np.random.seed(0)
+        path_losses, od_losses = [], []
+        for _ in range(30):
+            self.system.propose(sigma=0.05)
+            path_losses.append(
+                e_multi_optimize.traffic_loss(self.fp, self.samples)
+            )
+            od_losses.append(self.od(self.fp, self.samples))
+            self.system.reject()
+
+        # r = 0.88 and rank r = 0.88 here; 0.86 to 0.98 over other seeds
+        r = np.corrcoef(path_losses, od_losses)[0, 1]
+        rank_r = np.corrcoef(ranks(path_losses), ranks(od_losses))[0, 1]
+        self.assertGreater(r, 0.8)
+        self.assertGreater(rank_r, 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
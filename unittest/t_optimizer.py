@@ -0,0 +1,129 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import e_multi_optimize
+from o_optimizer import GibbsMHOptimizer, MTMOptimizer
+import o_sweep
+
+CASE_ID = 2  # final_2
+
+
+class OptimizerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # configs.toml and its asset paths are relative to the repository
+        cls.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def build(self, doors=None):
+        fp, config = e_multi_optimize.init_layout(CASE_ID, seed=0)
+        if doors is not None:
+            config.doors = doors
+        system = e_multi_optimize.create_door_system(fp, config)
+        samples = e_multi_optimize.make_sample_points(fp, config.sample_size)
+        return fp, system, samples
+
+    def test_gibbs_score_same_as_full(self):
+        # all doors open into the hall, then a loop of rooms 0, 3, 4 and 2
+        for doors in [None, [[0, 2], [0, 3], [3, 4], [2, 4], [2, 5], [1, 2]]]:
+            fp, system, samples = self.build(doors)
+
+            def global_f(fp):
+                return 2 * e_multi_optimize.entrance_loss(fp, system)
+
+            def full_score():
+                pair_costs = [
+                    e_multi_optimize.traffic_pair_loss(fp, start, end)[0]
+                    for start, end in zip(samples[:-1], samples[1:])
+                ]
+                return 2 / len(samples) * sum(pair_costs) + global_f(fp)
+
+            mh = GibbsMHOptimizer(
+                fp,
+                system,
+                e_multi_optimize.traffic_pair_loss,
+                0.01,
+                samples,
+                global_f=global_f,
+                refresh_every=0,
+            )
+            np.random.seed(0)
+            mh.init()
+            for _ in range(30):
+                n_accepted = mh.n_accepted
+                mh.step(sigma=0.2)
+                if mh.n_accepted > n_accepted:
+                    self.assertAlmostEqual(mh.prev_score, full_score())
+            self.assertGreater(mh.n_accepted, 10)
+
+    def test_mtm_acceptance_ratio(self):
+        fp, system, samples = self.build()
+        door = system.ecs.store.comps[0]
+        target = np.array([0.6, 0.4])
+        scores = []  # scores of one step, tries first
+
+        def f(fp, samples):
+            center = system.ratio_to_xy(door, door.ratio)
+            scores.append(np.linalg.norm(center - target))
+            return scores[-1]
+
+        k = 4
+        mh = MTMOptimizer(fp, system, f, 0.05, samples, k=k)
+        np.random.seed(0)
+        mh.init()
+        n_rejected = 0
+        for i in range(20):
+            scores.clear()
+            prev_score, T = mh.prev_score, mh.T
+            draws = []
+
+            # just below or above the ratio of the tries to the references
+            def rand():
+                self.assertEqual(len(scores), 2 * k - 1)
+                fy = np.array(scores[:k])
+                fx = np.array(scores[k:] + [prev_score])
+                alpha = np.exp(-fy / T).sum() / np.exp(-fx / T).sum()
+                u = min(alpha, 1.0) * (1 + 1e-6 if i % 2 else 1 - 1e-6)
+                draws.append((u, alpha))
+                return u
+
+            with mock.patch("numpy.random.rand", side_effect=rand):
+                mh.step(sigma=0.05)
+            u, alpha = draws[0]
+            if u < alpha:
+                self.assertIn(mh.prev_score, scores[:k])
+            else:
+                self.assertEqual(mh.prev_score, prev_score)
+                n_rejected += 1
+        self.assertGreater(n_rejected, 0)
+
+    def test_mtm_reaches_minimum(self):
+        fp, system, samples = self.build()
+        door = system.ecs.store.comps[0]
+        # the first door position on its wall; f is zero there
+        target = o_sweep.door_positions(system, door)[0][3]
+
+        def f(fp, samples):
+            center = system.ratio_to_xy(door, door.ratio)
+            return np.linalg.norm(center - target)
+
+        mh = MTMOptimizer(fp, system, f, 0.001, samples, k=4)
+        np.random.seed(0)
+        mh.init()
+        self.assertGreater(mh.prev_score, 0.04)
+        for _ in range(50):
+            mh.step(sigma=0.02)
+        mh.end()
+        self.assertAlmostEqual(mh.best_score, 0.0)
+        self.assertAlmostEqual(f(fp, samples), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+from f_room_graph import RoomGraph
+
+
+class _Room:
+    def __init__(self, rid):
+        self.rid = rid
+
+
+class _Door:
+    def __init__(self, ra, rb, xy, is_active=True):
+        self.bind_rooms = [ra, rb]
+        self.ratio = xy  # _System places a door at its ratio
+        self.is_active = is_active
+
+
+class _ECS:
+    def __init__(self, doors):
+        self.doors = dict(enumerate(doors))
+
+
+class _System:
+    def __init__(self, doors):
+        self.ecs = _ECS(doors)
+
+    def ratio_to_xy(self, door_comp, ratio):
+        return np.asarray(ratio, dtype=float)
+
+
+class RoomGraphTest(unittest.TestCase):
+    def create_graph(self):
+        # 0 - 1 - 2 in a row, 3 isolated; walls 0|1 in two pieces
+        src, dst = [0, 1, 0, 1, 1, 2], [1, 0, 1, 0, 2, 1]
+        wall_len = [0.25, 0.25, 0.25, 0.25, 0.5, 0.5]
+        centers = [[0, 0], [1, 0], [2, 0], [5, 5]]
+        return RoomGraph(4, src, dst, wall_len, centers)
+
+    def test_adjacency(self):
+        graph = self.create_graph()
+        np.testing.assert_array_equal(graph.neighbors(1), [0, 2])
+        self.assertEqual(len(graph.neighbors(3)), 0)
+        self.assertEqual(graph.edge(0, 2), -1)
+
+        k = graph.edge(0, 1)
+        self.assertAlmostEqual(graph.wall[k], 0.5)
+        self.assertAlmostEqual(graph.centroid[k], 1.0)
+        self.assertEqual(graph.to_dense().sum(), 4)
+
+    def test_set_doors(self):
+        graph = self.create_graph()
+        rooms = [_Room(i) for i in range(4)]
+        system = _System(
+            [
+                _Door(rooms[0], rooms[1], [0.5, 1.0]),
+                _Door(rooms[1], rooms[0], [0.5, 0.0]),  # the shorter one
+                _Door(rooms[1], rooms[2], [1.5, 0.0], is_active=False),
+            ]
+        )
+        graph.set_doors(system)
+
+        for r0, r1 in [(0, 1), (1, 0)]:
+            k = graph.edge(r0, r1)
+            self.assertAlmostEqual(graph.door[k], 1.0)
+            np.testing.assert_allclose(graph.portals[k], [0.5, 0.0])
+        self.assertEqual(graph.door[graph.edge(1, 2)], np.inf)
+
+    @unittest.skipUnless(importlib.util.find_spec("scipy"), "needs scipy")
+    def test_to_csr(self):
+        from scipy.sparse.csgraph import dijkstra
+
+        graph = self.create_graph()
+        dist = dijkstra(graph.to_csr("centroid"), indices=[0])[0]
+        np.testing.assert_allclose(dist, [0, 1, 2, np.inf])
+
+        # rooms without an active door are not connected
+        graph.set_doors(_System([]))
+        self.assertEqual(graph.to_csr("door").nnz, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
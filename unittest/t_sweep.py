@@ -0,0 +1,55 @@
+import os
+import unittest
+
+import numpy as np
+
+import e_multi_optimize
+import o_sweep
+import u_parallel
+
+CASE_ID = 2  # final_2
+
+
+class SweepTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # configs.toml and its asset paths are relative to the repository
+        cls.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def test_pool_matches_serial(self):
+        fp, system, f, samples = e_multi_optimize.build_case(CASE_ID)
+        base = u_parallel.to_eid_states(*system.get_states())
+
+        serial = o_sweep.sweep_doors(fp, system, f, samples, rows=[0, 1])
+        self.assertEqual(u_parallel.to_eid_states(*system.get_states()), base)
+
+        pooled = o_sweep.sweep_doors(
+            fp,
+            system,
+            f,
+            samples,
+            rows=[0, 1],
+            builder=e_multi_optimize.build_case,
+            builder_args=(CASE_ID,),
+            workers=2,
+            chunk_size=5,
+        )
+        self.assertEqual(set(serial["door"]), {0, 1})
+        self.assertFalse(np.isnan(serial["loss"]).any())
+        np.testing.assert_array_equal(serial, pooled)
+
+        # best_states picks the lowest swept loss of every door
+        eids, ratios = o_sweep.best_states(serial, system)
+        for row in [0, 1]:
+            door_sweep = serial[serial["door"] == row]
+            best = door_sweep[door_sweep["eid"] == eids[row]]
+            self.assertEqual(best["loss"].min(), door_sweep["loss"].min())
+
+
+if __name__ == "__main__":
+    unittest.main()